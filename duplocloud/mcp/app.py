@@ -4,32 +4,77 @@ This module provides the global FastMCP instance that other modules can import
 to register custom routes, tools, or resources using decorators. This follows
 the standard FastMCP pattern where the mcp instance is the central hub.
 
+Importing fastmcp costs most of a second, so the instance is only built on
+first access of ``mcp`` (PEP 562 module ``__getattr__``). Paths that never
+start the server, such as argument errors, skip that cost.
+
 Example:
     from duplocloud.mcp.app import mcp
 
     @mcp.tool()
     def my_tool():
         return "result"
+
+Tools added this way are served but not listed in the server's config
+(the ``config`` tool and ``/config``); register them with ``@custom_tool``
+to have them listed.
 """
 
-from importlib.metadata import version
+from typing import TYPE_CHECKING, Optional
+
+from .utils import json_bytes
+
+try:
+    # Written by setuptools-scm at build time
+    from ._version import __version__
+except ImportError:
+    from importlib.metadata import version
+
+    __version__ = version("duplocloud-mcp")
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+_mcp: Optional["FastMCP"] = None
+
+# The health payload never changes, so it is encoded once at import.
+_HEALTH_BODY = json_bytes({"status": "healthy", "service": "duplocloud-mcp"})
 
-from fastmcp import FastMCP
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
 
-# Global FastMCP instance - safe to create at import time (no credentials needed)
-mcp: FastMCP = FastMCP(
-    name="duplocloud-mcp",
-    version=version("duplocloud-mcp"),
-)
+def get_mcp() -> "FastMCP":
+    """Return the global FastMCP instance, creating it on first use.
 
+    Creation needs no credentials, so it is safe from any code path.
 
-@mcp.custom_route("/health", methods=["GET"])
-async def health_check(request: Request) -> Response:
+    Returns:
+        The shared FastMCP instance with the health route registered.
+    """
+    global _mcp
+    if _mcp is None:
+        from fastmcp import FastMCP
+
+        _mcp = FastMCP(
+            name="duplocloud-mcp",
+            version=__version__,
+        )
+        _mcp.custom_route("/health", methods=["GET"])(health_check)
+    return _mcp
+
+
+def __getattr__(name: str):
+    if name == "mcp":
+        return get_mcp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def health_check(request: "Request") -> "Response":
     """Health check endpoint for load balancers and monitoring.
 
     Returns:
         JSON response with service status.
     """
-    return JSONResponse({"status": "healthy", "service": "duplocloud-mcp"})
+    from starlette.responses import Response
+
+    return Response(_HEALTH_BODY, media_type="application/json")
@@ -12,17 +12,24 @@ four tools instead of one tool per resource+command:
 LLM workflow: resources → explain_resource → explain_command → execute.
 """
 
-import re
-from duplocloud.commander import commands_for, extract_args
+from collections.abc import Sequence
+from contextlib import contextmanager, nullcontext
+from copy import deepcopy
+from functools import cache
+
 from .ctx import Ctx, custom_tool
+from .utils import commands_for, extract_args
 
 
 # Args that are first-class params in execute() and should be skipped
 EXECUTE_FIRST_CLASS_ARGS = frozenset({"name", "body"})
 
+# Arg type names mapped to JSON schema types; anything else is a string
+JSON_TYPES = {"str": "string", "int": "integer", "float": "number", "bool": "boolean"}
+
 
 @custom_tool(name="resources", mode="compact")
-def resources(ctx: Ctx) -> list[str]:
+def resources(ctx: Ctx) -> Sequence[str]:
     """List available DuploCloud resources.
 
     Returns the names of all resources that match the server's resource filter.
@@ -31,6 +38,20 @@ def resources(ctx: Ctx) -> list[str]:
     return ctx.resources
 
 
+def _load_resource(ctx: Ctx, resource: str):
+    """Load a resource instance once per context.
+
+    DuploCtl.load builds a new instance on every call. The explain tools
+    only read command metadata from it, so they share one per resource.
+    Failed loads raise and are not cached.
+    """
+    loaded = ctx.cache.setdefault("resources", {})
+    resource_obj = loaded.get(resource)
+    if resource_obj is None:
+        resource_obj = loaded[resource] = ctx.duplo.load(resource)
+    return resource_obj
+
+
 @custom_tool(name="explain_resource", mode="compact")
 def explain_resource(ctx: Ctx, resource: str) -> dict:
     """List all commands available on a DuploCloud resource.
@@ -44,31 +65,48 @@ def explain_resource(ctx: Ctx, resource: str) -> dict:
     Args:
         resource: The resource name (e.g. "tenant", "service").
     """
-    duplo = ctx.duplo
-
-    if resource not in ctx.resources:
+    if resource not in ctx.resource_set:
         return {"error": f"Resource '{resource}' is not available."}
 
-    try:
-        resource_obj = duplo.load(resource)
-    except Exception as e:
-        return {"error": f"Resource '{resource}' not found: {e}"}
+    described = ctx.cache.setdefault("explain_resource", {})
+    result = described.get(resource)
+    if result is None:
+        try:
+            resource_obj = _load_resource(ctx, resource)
+        except Exception as e:
+            return {"error": f"Resource '{resource}' not found: {e}"}
+
+        try:
+            cmds = commands_for(resource)
+        except Exception as e:
+            return {"error": f"Commands not found for resource '{resource}': {e}"}
+
+        result = described[resource] = _describe_resource(resource_obj, resource, cmds)
+    return deepcopy(result)
 
-    try:
-        cmds = commands_for(resource)
-    except Exception as e:
-        return {"error": f"Commands not found for resource '{resource}': {e}"}
 
+def _describe_resource(resource_obj, resource: str, cmds: dict) -> dict:
+    """Build the explain_resource payload for one resource.
+
+    Args:
+        resource_obj: The loaded resource instance.
+        resource: The resource name.
+        cmds: The resource's commands from commands_for().
+
+    Returns:
+        The explain_resource result dict.
+    """
     result = {"resource": resource, "commands": {}}
     for cmd_name, cmd_info in cmds.items():
         method = getattr(resource_obj, cmd_name, None)
         summary = ""
         if method and method.__doc__:
-            summary = method.__doc__.strip().split('\n')[0]
+            # partition stops at the first newline instead of splitting all
+            summary = method.__doc__.lstrip().partition("\n")[0].rstrip()
 
         result["commands"][cmd_name] = {
             "summary": summary,
-            "aliases": cmd_info.get("aliases", []),
+            "aliases": list(cmd_info.get("aliases", [])),
         }
     return result
 
@@ -87,15 +125,18 @@ def explain_command(ctx: Ctx, resource: str, command: str) -> dict:
         resource: The resource name (e.g. "tenant", "service").
         command: The command name (e.g. "create", "find", "update_image").
     """
-    duplo = ctx.duplo
-
-    if resource not in ctx.resources:
+    if resource not in ctx.resource_set:
         return {"error": f"Resource '{resource}' is not available."}
 
+    described = ctx.cache.setdefault("explain_command", {})
+    result = described.get((resource, command))
+    if result is not None:
+        return deepcopy(result)
+
     # Load the resource first so the @Resource decorator fires and
     # populates the commander's `resources` registry before commands_for().
     try:
-        resource_obj = duplo.load(resource)
+        resource_obj = _load_resource(ctx, resource)
     except Exception as e:
         return {"error": f"Resource '{resource}' not found: {e}"}
 
@@ -110,30 +151,54 @@ def explain_command(ctx: Ctx, resource: str, command: str) -> dict:
             "available": list(cmds.keys()),
         }
 
-    cmd_info = cmds[command]
     method = getattr(resource_obj, command, None)
     if not method:
         return {"error": f"Method '{command}' not callable on resource '{resource}'."}
 
+    result = described[(resource, command)] = _describe_command(
+        ctx.duplo, resource, command, cmds[command], method
+    )
+    return deepcopy(result)
+
+
+def _describe_command(duplo, resource: str, command: str, cmd_info: dict, method) -> dict:
+    """Build the explain_command payload for one resource+command.
+
+    Resource classes, their commands and body models are fixed for the
+    life of the process, so explain_command keeps the payload in the
+    context's cache. Resources are only introspected the first time an
+    agent asks about them instead of at server startup.
+
+    Args:
+        duplo: The DuploCloud client instance.
+        resource: The resource name.
+        command: The command name.
+        cmd_info: The command's metadata from commands_for().
+        method: The command method on the loaded resource.
+
+    Returns:
+        The explain_command result dict.
+    """
     # Build args schema, skipping first-class execute params (name, body)
     # Arg class provides: type_name, positional, default, attributes
-    TYPE_MAP = {"str": "string", "int": "integer", "float": "number", "bool": "boolean"}
     args_properties = {}
     for arg in extract_args(method):
         param_name = arg.attributes.get("dest", arg.__name__)
         if param_name in EXECUTE_FIRST_CLASS_ARGS:
             continue
-        prop = {"type": TYPE_MAP.get(arg.type_name, "string")}
+        prop = {"type": JSON_TYPES.get(arg.type_name, "string")}
         if arg.attributes.get("help"):
             prop["description"] = arg.attributes["help"]
-        if arg.default is not None:
-            prop["default"] = arg.default
+        # Arg.default re-reads the arg's env var on every access
+        default = arg.default
+        if default is not None:
+            prop["default"] = default
         args_properties[param_name] = prop
 
     result = {
         "resource": resource,
         "command": command,
-        "aliases": cmd_info.get("aliases", []),
+        "aliases": list(cmd_info.get("aliases", [])),
         "args_schema": {
             "type": "object",
             "description": "Key-value pairs for the 'args' parameter in execute.",
@@ -148,11 +213,28 @@ def explain_command(ctx: Ctx, resource: str, command: str) -> dict:
         result["model"] = model_name
         model_cls = duplo.load_model(model_name)
         if model_cls and hasattr(model_cls, "model_json_schema"):
-            result["body_schema"] = model_cls.model_json_schema(by_alias=True)
+            result["body_schema"] = _body_schema(model_cls)
 
     return result
 
 
+@cache
+def _body_schema(model_cls) -> dict:
+    """Return the by-alias JSON schema for a Pydantic body model.
+
+    Pydantic regenerates the schema on every ``model_json_schema`` call,
+    and several commands (e.g. create and update) share one model, so the
+    schema is cached per model class.
+
+    Args:
+        model_cls: The Pydantic model class.
+
+    Returns:
+        The JSON schema dict.
+    """
+    return model_cls.model_json_schema(by_alias=True)
+
+
 @custom_tool(name="execute", mode="compact")
 def execute(
     ctx: Ctx,
@@ -188,21 +270,32 @@ def execute(
     """
     duplo = ctx.duplo
 
-    if resource not in ctx.resources:
+    if resource not in ctx.resource_set:
         return f"Error: Resource '{resource}' is not allowed by the resource filter."
-    command_filter = re.compile(ctx.config.get("command_filter", ".*"))
-    if not command_filter.fullmatch(command):
+    if not ctx.command_re.fullmatch(command):
         return f"Error: Command '{command}' is not allowed by the command filter."
 
-    duplo.wait = wait
-
     kwargs = dict(args) if args else {}
     if name is not None:
         kwargs["name"] = name
     if body is not None:
         kwargs["body"] = body
 
+    # Only touch the shared client when this call needs a different wait mode
+    override = nullcontext() if duplo.wait == wait else _override_wait(duplo, wait)
     try:
-        return duplo(resource, command, query=query, **kwargs)
+        with override:
+            return duplo(resource, command, query=query, **kwargs)
     except Exception as e:
         return f"Error: {e}"
+
+
+@contextmanager
+def _override_wait(duplo, wait: bool):
+    """Set ``duplo.wait`` for one command, restoring the previous value."""
+    previous = duplo.wait
+    duplo.wait = wait
+    try:
+        yield duplo
+    finally:
+        duplo.wait = previous
@@ -5,9 +5,10 @@ expose it as an MCP tool and an HTTP route, both injected with Ctx.
 """
 
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 
 from .ctx import Ctx, custom_route, custom_tool
+from .utils import json_bytes
 
 
 def build_config(ctx: Ctx) -> dict:
@@ -15,7 +16,8 @@ def build_config(ctx: Ctx) -> dict:
 
     Mirrors the output of ``duploctl`` (no args) but replaces
     AvailableResources with the filtered list and appends
-    MCP-specific settings.
+    MCP-specific settings. Built once per context and cached on it, since
+    everything it reads is fixed once the server has registered its tools.
 
     Args:
         ctx: The injected server context.
@@ -23,10 +25,14 @@ def build_config(ctx: Ctx) -> dict:
     Returns:
         A dict suitable for JSON serialization.
     """
-    cfg = dict(ctx.duplo.config)
-    cfg["AvailableResources"] = ctx.resources
-    cfg["Tools"] = sorted(ctx.tools)
-    cfg["MCP"] = ctx.config
+    cfg = ctx.cache.get("config")
+    if cfg is None:
+        cfg = ctx.cache["config"] = {
+            **ctx.duplo.config,
+            "AvailableResources": ctx.resources,
+            "Tools": list(ctx.tools),
+            "MCP": ctx.config,
+        }
     return cfg
 
 
@@ -43,4 +49,7 @@ def config_tool(ctx: Ctx) -> dict:
 @custom_route("/config", methods=["GET"])
 async def config_route(ctx: Ctx, request: Request):
     """GET /config -- same payload as the config tool."""
-    return JSONResponse(build_config(ctx))
+    body = ctx.cache.get("config_body")
+    if body is None:
+        body = ctx.cache["config_body"] = json_bytes(build_config(ctx))
+    return Response(body, media_type="application/json")
@@ -12,11 +12,17 @@ when the server is running in a matching mode. If omitted the function
 applies to all modes.
 """
 
+import inspect
+import re
+from collections.abc import Sequence
 from dataclasses import dataclass, field
+from functools import cache
 from typing import Optional
 
 from duplocloud.controller import DuploCtl
 
+from .utils import compile_filter
+
 # ---------------------------------------------------------------------------
 # Context
 # ---------------------------------------------------------------------------
@@ -28,22 +34,65 @@ class Ctx:
     Attributes:
         duplo: The DuploCloud client instance.
         config: Server configuration dict (transport, port, filters, etc.).
-        tools: List of registered tool names (populated after registration).
+        tools: Registered tool names (populated after registration), kept
+            sorted.
         resources: Filtered resource names available to this server instance.
+            The server passes its sorted tuple, which is safe to share.
+        command_re: Compiled command filter. Compiled from
+            ``config["command_filter"]`` when not given.
+        resource_set: Set view of ``resources`` for O(1) membership checks.
+        cache: Values derived from this snapshot (e.g. the config payload).
+            A Ctx is rebuilt whenever tools or resources change, which
+            invalidates it.
     """
     duplo: DuploCtl
     config: dict = field(default_factory=dict)
     tools: list[str] = field(default_factory=list)
-    resources: list[str] = field(default_factory=list)
+    resources: Sequence[str] = field(default_factory=list)
+    command_re: re.Pattern | None = None
+    resource_set: frozenset[str] = field(init=False, repr=False)
+    cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.tools = sorted(self.tools)
+        if self.command_re is None:
+            self.command_re = compile_filter(self.config.get("command_filter", ".*"))
+        self.resource_set = frozenset(self.resources)
 
 
 # ---------------------------------------------------------------------------
 # Registry
 # ---------------------------------------------------------------------------
 
-# Module-level lists that decorators append to.
-_tool_registry: list[dict] = []
-_route_registry: list[dict] = []
+# Module-level registries that decorators append to, bucketed by mode so a
+# drain is two dict pops instead of a filter over every entry.
+_tool_registry: dict[str | None, list[dict]] = {}
+_route_registry: dict[str | None, list[dict]] = {}
+
+
+@cache
+def ctx_free_signature(fn) -> tuple[inspect.Signature, dict]:
+    """Return fn's signature and annotations with the ``ctx`` parameter removed.
+
+    This is what FastMCP should see for a custom tool: only the
+    user-facing parameters. Cached per function, so wrapping the same
+    function again (a server restart in the same process) skips
+    ``inspect``. Treat the returned annotations as read-only.
+
+    Args:
+        fn: A custom tool function taking ``ctx`` as its first parameter.
+
+    Returns:
+        A ``(signature, annotations)`` tuple.
+    """
+    sig = inspect.signature(fn)
+    params = [p for p in sig.parameters.values() if p.name != "ctx"]
+    annotations = {
+        p.name: p.annotation
+        for p in params
+        if p.annotation is not inspect.Parameter.empty
+    }
+    return sig.replace(parameters=params), annotations
 
 
 def custom_tool(name: str = None, description: str = None, mode: str = None):
@@ -62,11 +111,15 @@ def custom_tool(name: str = None, description: str = None, mode: str = None):
         The original function, unmodified.
     """
     def decorator(fn):
-        _tool_registry.append({
+        # Inspect once here so registration only has to bind ctx
+        signature, annotations = ctx_free_signature(fn)
+        _tool_registry.setdefault(mode, []).append({
             "fn": fn,
             "name": name or fn.__name__,
             "description": description or (fn.__doc__ or ""),
             "mode": mode,
+            "signature": signature,
+            "annotations": annotations,
         })
         return fn
     return decorator
@@ -87,7 +140,7 @@ def custom_route(path: str, methods: list[str], mode: str = None):
         The original function, unmodified.
     """
     def decorator(fn):
-        _route_registry.append({
+        _route_registry.setdefault(mode, []).append({
             "fn": fn,
             "path": path,
             "methods": methods,
@@ -103,21 +156,29 @@ def drain_tools(mode: Optional[str] = None) -> list[dict]:
     Entries with ``mode=None`` always match. Consumed entries are removed
     from the registry so they are not registered twice.
     """
-    matched = [
-        e for e in _tool_registry
-        if e["mode"] is None or e["mode"] == mode
-    ]
-    for e in matched:
-        _tool_registry.remove(e)
-    return matched
+    return _drain(_tool_registry, mode)
 
 
 def drain_routes(mode: Optional[str] = None) -> list[dict]:
     """Return and clear all registered custom routes matching *mode*."""
-    matched = [
-        e for e in _route_registry
-        if e["mode"] is None or e["mode"] == mode
-    ]
-    for e in matched:
-        _route_registry.remove(e)
-    return matched
+    return _drain(_route_registry, mode)
+
+
+def has_pending(mode: str | None = None) -> bool:
+    """Whether a drain for *mode* would return any custom tools or routes.
+
+    Checks exactly the buckets the drains pop, so entries left for other
+    modes do not count.
+    """
+    return any(
+        registry.get(None) or registry.get(mode)
+        for registry in (_tool_registry, _route_registry)
+    )
+
+
+def _drain(registry: dict[str | None, list[dict]], mode: str | None) -> list[dict]:
+    """Pop the mode-agnostic bucket and the bucket for *mode*.
+
+    Mode-agnostic entries come first, each bucket in registration order.
+    """
+    return registry.pop(None, []) + registry.pop(mode, [])
@@ -9,22 +9,20 @@ It does not know how tool wrapping, signature rewriting, or model resolution
 works -- that is delegated to ToolRegistrar.
 """
 
-import asyncio
 import inspect
-import re
+import logging
+from functools import partial
 from typing import Any, Optional
 
 from duplocloud.argtype import Arg
 from duplocloud.controller import DuploCtl
 from duplocloud.commander import Command, Resource, available_resources, load_format
 from duplocloud.resource import DuploResource
-from fastmcp.utilities.logging import get_logger
 
-from . import compact_tools as _compact_tools  # noqa: F401
-from . import config_display as _config_display  # noqa: F401
-from .app import mcp as mcp_app
-from .ctx import Ctx, drain_routes, drain_tools
+from .app import get_mcp
+from .ctx import Ctx, ctx_free_signature, drain_routes, drain_tools, has_pending
 from .tools import ToolRegistrar
+from .utils import MATCH_ALL, compile_filter, get_logger
 
 logger = get_logger(__name__)
 
@@ -32,11 +30,26 @@ logger = get_logger(__name__)
 # "mcp" is excluded to prevent the server from registering itself.
 _EXCLUDED_RESOURCES = {"mcp"}
 
+
+async def _route_dispatch(fn, ctx: Ctx, request):
+    """Call a custom route handler with ctx injected ahead of the request."""
+    return await fn(ctx, request)
+
+
 # ---------------------------------------------------------------------------
 # MCP-specific Arg types
 # ---------------------------------------------------------------------------
 
-TRANSPORT = Arg(
+def _mcp_arg(name: str, *flags: str, env: str, help: str, **kwargs) -> Arg:
+    """Build an Arg whose help text names its environment variable.
+
+    duploctl already falls back to ``env`` when the flag is omitted; this
+    only makes that fallback visible in ``duploctl mcp --help``.
+    """
+    return Arg(name, *flags, help=f"{help} [env: {env}]", env=env, **kwargs)
+
+
+TRANSPORT = _mcp_arg(
     "transport", "-tp",
     help="The transport protocol to use (stdio or http)",
     default="stdio",
@@ -44,7 +57,7 @@ TRANSPORT = Arg(
     env="DUPLO_MCP_TRANSPORT",
 )
 
-PORT = Arg(
+PORT = _mcp_arg(
     "port", "-mp",
     help="The port to listen on for HTTP transport",
     type=int,
@@ -52,21 +65,21 @@ PORT = Arg(
     env="DUPLO_MCP_PORT",
 )
 
-RESOURCE_FILTER = Arg(
+RESOURCE_FILTER = _mcp_arg(
     "resource_filter", "--resource-filter",
     help="Regex pattern for resource names to include",
     default=".*",
     env="DUPLO_MCP_RESOURCE_FILTER",
 )
 
-COMMAND_FILTER = Arg(
+COMMAND_FILTER = _mcp_arg(
     "command_filter", "--command-filter",
     help="Regex pattern for command names to include",
     default=".*",
     env="DUPLO_MCP_COMMAND_FILTER",
 )
 
-TOOL_MODE = Arg(
+TOOL_MODE = _mcp_arg(
     "tool_mode", "--tool-mode",
     help="Tool registration mode: expanded or compact",
     default="compact",
@@ -90,14 +103,31 @@ class DuploCloudMCP(DuploResource):
     def __init__(self, duplo: DuploCtl):
         super().__init__(duplo)
         self.duplo.output = None
-        self.mcp = mcp_app
-        self._filtered_resources: list[str] = []
+        self._mcp = None
+        self._filtered_resources: tuple[str, ...] = ()
+        self._registered_tool_names: list[str] = []
+        self._ctx: Ctx | None = None
         self.transport = "stdio"
         self.port = 8000
-        self.resource_filter = re.compile(".*")
-        self.command_filter = re.compile(".*")
+        self.resource_filter = MATCH_ALL
+        self.command_filter = MATCH_ALL
         self.tool_mode = "compact"
 
+    @property
+    def mcp(self):
+        """The FastMCP instance tools are registered on.
+
+        Defaults to the global instance from :mod:`.app`, resolved on first
+        access so fastmcp is only imported once the server actually starts.
+        """
+        if self._mcp is None:
+            self._mcp = get_mcp()
+        return self._mcp
+
+    @mcp.setter
+    def mcp(self, value):
+        self._mcp = value
+
     def __call__(self, *args):
         """Parse CLI args and start the MCP server.
 
@@ -127,14 +157,19 @@ class DuploCloudMCP(DuploResource):
         if port is not None:
             self.port = port
         if resource_filter is not None:
-            self.resource_filter = re.compile(resource_filter)
+            self.resource_filter = compile_filter(resource_filter)
         if command_filter is not None:
-            self.command_filter = re.compile(command_filter)
+            self.command_filter = compile_filter(command_filter)
         if tool_mode is not None:
             self.tool_mode = tool_mode
 
         self.duplo.validate = self.tool_mode == "compact"
 
+        # Resolve the FastMCP instance before anything is logged: importing
+        # fastmcp is what installs the handlers on the fastmcp.* loggers.
+        if self._mcp is None:
+            self._mcp = get_mcp()
+
         self.register_tools()
         self._start_transport()
 
@@ -152,27 +187,28 @@ class DuploCloudMCP(DuploResource):
         Args:
             resource_names: Explicit list of resources, or None for all.
         """
+        # Resources and tools are about to change
+        self._ctx = None
+
         if resource_names is None:
             resource_names = available_resources()
 
-        # Always strip internal resources first
-        resource_names = [
-            name for name in resource_names
-            if name not in _EXCLUDED_RESOURCES
-        ]
-
-        # Apply resource filter
-        filtered = [
-            name for name in resource_names
-            if self.resource_filter.fullmatch(name)
-        ]
-
-        skipped = set(resource_names) - set(filtered)
-        if skipped:
-            for name in sorted(skipped):
-                logger.debug(f"Skipping resource '{name}' (resource filter)")
-
-        self._filtered_resources = sorted(filtered)
+        # One pass strips internal resources (always) and applies the
+        # resource filter, keeping skipped names for the debug log
+        filtered, skipped = [], []
+        fullmatch = self.resource_filter.fullmatch
+        for name in resource_names:
+            if name in _EXCLUDED_RESOURCES:
+                continue
+            (filtered if fullmatch(name) else skipped).append(name)
+
+        if skipped and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Skipping resources (resource filter): %s",
+                ", ".join(sorted(skipped)),
+            )
+
+        self._filtered_resources = tuple(sorted(filtered))
         logger.info(f"Registering tools for: {', '.join(self._filtered_resources)}")
 
         if self.tool_mode == "compact":
@@ -180,6 +216,7 @@ class DuploCloudMCP(DuploResource):
         else:
             registrar = ToolRegistrar(self.mcp, self.duplo, self.command_filter)
             registrar.register(filtered)
+            self._registered_tool_names.extend(registrar.tool_names)
 
         # Register custom tools and routes, injecting context
         self.register_custom(mode=self.tool_mode)
@@ -195,18 +232,34 @@ class DuploCloudMCP(DuploResource):
         Args:
             mode: Only register entries matching this mode (None = all).
         """
+        # The built-in custom tools and routes register themselves on import.
+        # Importing here rather than at module top keeps starlette and the
+        # compact tool module off the path of `duploctl mcp --help`.
+        from . import compact_tools, config_display  # noqa: F401
+
+        # Nothing left to drain, so skip building a context for no one.
+        if not has_pending(mode):
+            return
+
         ctx = self._build_ctx()
 
         # --- custom tools ---
-        for entry in drain_tools(mode):
+        tools = drain_tools(mode)
+        for entry in tools:
             fn = entry["fn"]
             tool_name = entry["name"]
             description = entry["description"]
 
             # Build a wrapper that injects ctx, hiding it from FastMCP
-            wrapper = self._inject_ctx(fn, ctx)
+            wrapper = self._inject_ctx(
+                fn, ctx, entry["signature"], entry["annotations"]
+            )
             self.mcp.tool(name=tool_name, description=description or None)(wrapper)
+            self._registered_tool_names.append(tool_name)
             logger.info(f"    {tool_name} (custom)")
+        if tools:
+            # The tool list changed; the next _build_ctx takes a new snapshot
+            self._ctx = None
 
         # --- custom routes ---
         for entry in drain_routes(mode):
@@ -214,11 +267,9 @@ class DuploCloudMCP(DuploResource):
             path = entry["path"]
             methods = entry["methods"]
 
-            # Route wrapper: inject ctx, pass request through
-            async def route_handler(request, _fn=fn, _ctx=ctx):
-                return await _fn(_ctx, request)
-
-            self.mcp.custom_route(path, methods=methods)(route_handler)
+            # Route handler: inject ctx, pass request through
+            handler = partial(_route_dispatch, fn, ctx)
+            self.mcp.custom_route(path, methods=methods)(handler)
             logger.info(f"    route {path} (custom)")
 
     # ------------------------------------------------------------------
@@ -226,8 +277,14 @@ class DuploCloudMCP(DuploResource):
     # ------------------------------------------------------------------
 
     def _build_ctx(self) -> Ctx:
-        """Build a Ctx snapshot from current server state."""
-        return Ctx(
+        """Build a Ctx snapshot from current server state.
+
+        The snapshot is reused until registration changes the resources or
+        tools it describes.
+        """
+        if self._ctx is not None:
+            return self._ctx
+        self._ctx = Ctx(
             duplo=self.duplo,
             config={
                 "transport": self.transport,
@@ -237,25 +294,28 @@ class DuploCloudMCP(DuploResource):
                 "tool_mode": self.tool_mode,
             },
             tools=self._list_tool_names(),
-            resources=list(self._filtered_resources),
+            resources=self._filtered_resources,
+            command_re=self.command_filter,
         )
+        return self._ctx
 
     def _list_tool_names(self) -> list[str]:
-        """Collect names of all tools currently registered on the FastMCP instance."""
+        """Names of the tools this server has registered so far.
 
-        async def _get():
-            return [t.name for t in await self.mcp.list_tools()]
-
-        # If there's already a running loop, schedule on it; otherwise run fresh
-        try:
-            asyncio.get_running_loop()
-            asyncio.ensure_future(_get())
-            return []
-        except RuntimeError:
-            return asyncio.run(_get())
+        Tracked as tools are registered, so no event loop is needed to
+        ask FastMCP for them. Only duploctl resource tools and
+        ``@custom_tool`` functions are listed; tools added straight onto
+        the FastMCP instance (``app.mcp.tool()``) are not.
+        """
+        return list(self._registered_tool_names)
 
     @staticmethod
-    def _inject_ctx(fn, ctx: Ctx):
+    def _inject_ctx(
+        fn,
+        ctx: Ctx,
+        signature: inspect.Signature | None = None,
+        annotations: dict | None = None,
+    ):
         """Wrap fn so that ctx is injected and hidden from FastMCP.
 
         Removes the ``ctx`` parameter from the wrapper's signature so
@@ -264,34 +324,30 @@ class DuploCloudMCP(DuploResource):
         Args:
             fn: The function to wrap (must accept ctx as first arg).
             ctx: The context to inject.
+            signature: Precomputed ctx-free signature (see
+                :func:`ctx_free_signature`); computed when omitted.
+            annotations: Precomputed annotations matching ``signature``.
 
         Returns:
             A wrapper with ctx-free signature.
         """
-        sig = inspect.signature(fn)
-        new_params = [
-            p for p in sig.parameters.values()
-            if p.name != "ctx"
-        ]
+        if signature is None:
+            signature, annotations = ctx_free_signature(fn)
 
         def wrapper(*args, **kwargs):
             return fn(ctx, *args, **kwargs)
 
         wrapper.__name__ = fn.__name__
         wrapper.__doc__ = fn.__doc__
-        wrapper.__signature__ = sig.replace(parameters=new_params)
-        wrapper.__annotations__ = {
-            p.name: p.annotation
-            for p in new_params
-            if p.annotation is not inspect.Parameter.empty
-        }
+        wrapper.__signature__ = signature
+        wrapper.__annotations__ = annotations
         return wrapper
 
     def _start_transport(self):
         """Log environment info and active filters, then run the transport."""
-        yaml_formatter = load_format("yaml")
-        formatted_info = yaml_formatter(self.duplo.config)
-        logger.info(f"DuploCloud Environment Info:\n{formatted_info}")
+        if logger.isEnabledFor(logging.INFO):
+            yaml_formatter = load_format("yaml")
+            logger.info("DuploCloud Environment Info:\n%s", yaml_formatter(self.duplo.config))
 
         logger.info(f"Tool mode: {self.tool_mode}")
         if self.resource_filter.pattern != ".*":
@@ -6,19 +6,28 @@ wrapper construction, and FastMCP registration.
 """
 
 import inspect
+import logging
 import re
+from functools import cache
+from typing import TYPE_CHECKING
 
 from duplocloud.controller import DuploCtl
-from duplocloud.commander import commands_for, extract_args
-from fastmcp import FastMCP
-from fastmcp.utilities.logging import get_logger
 
-from .utils import get_docstring_summary, resolve_docstring_template
+from .utils import (
+    commands_for,
+    extract_args,
+    get_docstring_summary,
+    get_logger,
+    resolve_docstring_template,
+)
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
 
 logger = get_logger(__name__)
 
 # Operations that should also be registered as MCP resources (future)
-READ_OPERATIONS = {"list", "find", "logs", "pods"}
+READ_OPERATIONS = frozenset({"list", "find", "logs", "pods"})
 
 
 class ToolRegistrar:
@@ -26,10 +35,11 @@ class ToolRegistrar:
 
     Holds references to the FastMCP instance, DuploClient, and the compiled
     command filter regex. Each public method does one thing and is
-    independently testable.
+    independently testable. Names of registered tools are collected in
+    ``tool_names`` in registration order.
     """
 
-    def __init__(self, mcp: FastMCP, duplo: DuploCtl, command_filter: re.Pattern):
+    def __init__(self, mcp: "FastMCP", duplo: DuploCtl, command_filter: re.Pattern):
         """Initialize the registrar.
 
         Args:
@@ -40,6 +50,8 @@ class ToolRegistrar:
         self.mcp = mcp
         self.duplo = duplo
         self.command_filter = command_filter
+        self.tool_names: list[str] = []
+        self._model_cache: dict[str, type | None] = {}
 
     def register(self, resource_names: list[str]):
         """Register tools for a list of resources.
@@ -54,7 +66,7 @@ class ToolRegistrar:
             try:
                 self.register_resource(resource_name)
             except Exception as e:
-                logger.error(f"Failed to register commands for {resource_name}: {e}")
+                logger.error("Failed to register commands for %s: %s", resource_name, e)
 
     def register_resource(self, resource_name: str):
         """Register all matching commands from a single resource.
@@ -69,19 +81,23 @@ class ToolRegistrar:
         commands = commands_for(resource_name)
 
         logger.info("")
-        logger.info(f"--- {resource_name}")
+        logger.info("--- %s", resource_name)
+
+        # No per-command filter call when the filter matches everything
+        fullmatch = None if self.command_filter.pattern == ".*" else self.command_filter.fullmatch
+        register_tool = self.register_tool
 
         for method_name, command_info in commands.items():
-            if not self.command_filter.fullmatch(method_name):
-                logger.debug(f"    skip {resource_name}_{method_name} (command filter)")
+            if fullmatch and not fullmatch(method_name):
+                logger.debug("    skip %s_%s (command filter)", resource_name, method_name)
                 continue
 
             method = getattr(resource, method_name, None)
             if not method or not callable(method):
-                logger.warning(f"    Method '{method_name}' not found or not callable")
+                logger.warning("    Method '%s' not found or not callable", method_name)
                 continue
 
-            self.register_tool(resource_name, method_name, method, command_info)
+            register_tool(resource_name, method_name, method, command_info)
 
     def register_tool(self, resource_name: str, method_name: str, method, command_info: dict):
         """Register a single duploctl method as an MCP tool.
@@ -102,9 +118,10 @@ class ToolRegistrar:
         wrapper = self.build_wrapper(method, tool_name, resolved_doc, params)
 
         self.mcp.tool(name=tool_name, description=resolved_doc)(wrapper)
+        self.tool_names.append(tool_name)
 
-        doc_summary = get_docstring_summary(resolved_doc)
-        logger.info(f"    {tool_name}{doc_summary}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("    %s%s", tool_name, get_docstring_summary(resolved_doc))
 
     def build_params(self, method, command_info: dict) -> list[inspect.Parameter]:
         """Build inspect.Parameter list for a tool wrapper.
@@ -114,6 +131,10 @@ class ToolRegistrar:
         parameter is named "body", loads the Pydantic model class and uses it
         as the annotation instead of dict.
 
+        The Parameters are built once per function and model class, so
+        registering the same commands again (e.g. a second server start in
+        one process) reuses them.
+
         Args:
             method: The duploctl method.
             command_info: The command schema dict (may contain "model" key).
@@ -121,52 +142,38 @@ class ToolRegistrar:
         Returns:
             A list of inspect.Parameter objects for the wrapper signature.
         """
-        cliargs = extract_args(method)
-        if not cliargs:
-            return []
-
-        sig = inspect.signature(method)
-
         # Resolve model class if the command has one
         model_name = command_info.get("model")
-        model_cls = self.duplo.load_model(model_name) if model_name else None
-
-        params = []
-        for arg in cliargs:
-            # The Arg's dest attribute (if set) maps to the actual Python
-            # parameter name. E.g. BODY has __name__="file" but dest="body".
-            param_name = arg.attributes.get("dest", arg.__name__)
-            orig_param = sig.parameters.get(param_name)
-            if not orig_param:
-                continue
+        model_cls = self.load_model(model_name) if model_name else None
+
+        # Key on the plain function: every load() binds a fresh method
+        func = getattr(method, "__func__", method)
+        return list(_build_params(func, model_cls))
+
+    def load_model(self, model_name: str):
+        """Resolve a body model class by name, once per registrar.
 
-            # Use Pydantic model for body params when available,
-            # otherwise fall back to dict for file-type args
-            annotation = arg.__supertype__
-            if model_cls and param_name == "body":
-                annotation = model_cls
-            elif param_name == "body":
-                annotation = dict
-
-            param = inspect.Parameter(
-                name=param_name,
-                kind=inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                default=(
-                    orig_param.default
-                    if orig_param.default is not inspect.Parameter.empty
-                    else inspect.Parameter.empty
-                ),
-                annotation=annotation,
-            )
-            params.append(param)
-
-        return params
+        Many commands share a model, so lookups (including misses) are
+        cached.
+
+        Args:
+            model_name: The model name from the command schema.
+
+        Returns:
+            The Pydantic model class, or None if it cannot be loaded.
+        """
+        if model_name not in self._model_cache:
+            self._model_cache[model_name] = self.duplo.load_model(model_name)
+        return self._model_cache[model_name]
 
     def build_wrapper(self, method, tool_name: str, doc: str, params: list[inspect.Parameter]):
         """Build a wrapper function for a duploctl method.
 
         Creates a closure that calls the original method, sets __name__,
         __doc__, __signature__, and __annotations__ for FastMCP introspection.
+        Without params there is nothing to rewrite, so the method itself is
+        returned; register_tool passes the tool name and description to
+        FastMCP explicitly.
 
         Args:
             method: The duploctl method to wrap.
@@ -175,20 +182,60 @@ class ToolRegistrar:
             params: The inspect.Parameter list from build_params.
 
         Returns:
-            The wrapper function with proper metadata.
+            The wrapper function with proper metadata, or the method.
         """
+        if not params:
+            return method
+
         def wrapper(*args, **kwargs):
             return method(*args, **kwargs)
 
         wrapper.__name__ = tool_name
         wrapper.__doc__ = doc
+        wrapper.__annotations__ = {p.name: p.annotation for p in params}
+        wrapper.__signature__ = inspect.Signature(params)
+        return wrapper
 
-        if params:
-            wrapper.__annotations__ = {p.name: p.annotation for p in params}
-            wrapper.__signature__ = inspect.Signature(params)
-        else:
-            sig = inspect.signature(method)
-            wrapper.__signature__ = sig
-            wrapper.__annotations__ = method.__annotations__
 
-        return wrapper
+@cache
+def _build_params(func, model_cls) -> tuple[inspect.Parameter, ...]:
+    """Build the wrapper Parameters for a command function.
+
+    Args:
+        func: The duploctl command function (unbound).
+        model_cls: The Pydantic model for the body param, or None.
+
+    Returns:
+        The Parameters in argument order.
+    """
+    cliargs = extract_args(func)
+    if not cliargs:
+        return ()
+
+    # Plain dict: cheaper lookups than the Signature's mappingproxy
+    orig_params = dict(inspect.signature(func).parameters)
+
+    params = []
+    for arg in cliargs:
+        # The Arg's dest attribute (if set) maps to the actual Python
+        # parameter name. E.g. BODY has __name__="file" but dest="body".
+        param_name = arg.attributes.get("dest", arg.__name__)
+        orig_param = orig_params.get(param_name)
+        if not orig_param:
+            continue
+
+        # Use Pydantic model for body params when available,
+        # otherwise fall back to dict for file-type args
+        annotation = arg.__supertype__
+        if model_cls and param_name == "body":
+            annotation = model_cls
+        elif param_name == "body":
+            annotation = dict
+
+        # Keep the original name and default, swapping in the base type
+        params.append(orig_param.replace(
+            kind=inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            annotation=annotation,
+        ))
+
+    return tuple(params)
@@ -1,8 +1,203 @@
 """Utility functions for the DuploCloud MCP server."""
 
+import json
+import logging
+import re
+from functools import cache, lru_cache
+
 from jinja2 import Template
 
+from duplocloud import commander as _commander
+
+try:
+    # Optional speedup: pip install "duplocloud-mcp[orjson]"
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger nested under the ``fastmcp`` namespace.
+
+    Same result as ``fastmcp.utilities.logging.get_logger``, so records go
+    through fastmcp's handlers, but without importing fastmcp at module
+    load time.
+
+    Args:
+        name: The logger name, usually ``__name__``.
+
+    Returns:
+        The ``fastmcp.<name>`` logger.
+    """
+    return logging.getLogger(f"fastmcp.{name}")
+
+
+class _MatchAll:
+    """Stand-in for the default ``.*`` filter that skips the regex engine.
+
+    Exposes the two members callers use on a compiled filter: ``pattern``
+    and ``fullmatch``, which like ``.*`` accepts any name without a newline.
+    """
+
+    pattern = ".*"
+
+    @staticmethod
+    def fullmatch(string: str) -> bool:
+        return "\n" not in string
+
+    def __repr__(self) -> str:
+        return "MATCH_ALL"
+
+
+MATCH_ALL = _MatchAll()
+
+# Filters that are just names ("tenant|service") or a name prefix ("aws.*")
+_LITERALS_RE = re.compile(r"[\w-]+(?:\|[\w-]+)*")
+_PREFIX_RE = re.compile(r"([\w-]+)\.\*")
+
+
+class _LiteralFilter:
+    """Filter for an alternation of plain names, matched by set lookup."""
+
+    __slots__ = ("names", "pattern")
+
+    def __init__(self, pattern: str, names: frozenset[str]):
+        self.pattern = pattern
+        self.names = names
+
+    def fullmatch(self, string: str) -> bool:
+        return string in self.names
+
+    def __repr__(self) -> str:
+        return f"_LiteralFilter({self.pattern!r})"
+
+
+class _PrefixFilter:
+    """Filter for ``<prefix>.*``, matched with ``str.startswith``.
+
+    ``.`` does not match a newline, so names containing one are rejected,
+    as the regex would.
+    """
+
+    __slots__ = ("pattern", "prefix")
+
+    def __init__(self, pattern: str, prefix: str):
+        self.pattern = pattern
+        self.prefix = prefix
+
+    def fullmatch(self, string: str) -> bool:
+        return string.startswith(self.prefix) and "\n" not in string
+
+    def __repr__(self) -> str:
+        return f"_PrefixFilter({self.pattern!r})"
+
+
+@lru_cache(maxsize=32)
+def compile_filter(pattern: str):
+    """Compile a resource/command filter pattern.
+
+    The default ``.*`` maps to :data:`MATCH_ALL` so the common unfiltered
+    case never runs a regex. Patterns that only list names, optionally
+    grouped and anchored (``^(tenant|service)$``), become a set lookup, and
+    ``<prefix>.*`` becomes a ``startswith`` check. Anything else is
+    compiled as a regex. Results are cached per process.
+
+    Every return value has the ``pattern`` and ``fullmatch`` members of a
+    compiled regex; ``fullmatch`` is only meant to be used for truthiness.
+
+    Args:
+        pattern: The filter regex.
+
+    Returns:
+        A filter object matching names like ``re.fullmatch`` would.
+    """
+    if pattern == ".*":
+        return MATCH_ALL
+    # Anchors are redundant under fullmatch
+    body = pattern.removeprefix("^").removesuffix("$")
+    if body.startswith("(") and body.endswith(")"):
+        body = body[1:-1]
+    if _LITERALS_RE.fullmatch(body):
+        return _LiteralFilter(pattern, frozenset(body.split("|")))
+    prefix = _PREFIX_RE.fullmatch(body)
+    if prefix:
+        return _PrefixFilter(pattern, prefix.group(1))
+    return re.compile(pattern)
+
+
+@cache
+def commands_for(name: str) -> dict:
+    """Get the @Command methods of a resource, including inherited ones.
+
+    Delegates to ``duplocloud.commander.commands_for``, which scans every
+    command in the schema on each call, and caches the result per resource
+    name. A resource's commands are fixed once its class is defined; call
+    ``commands_for.cache_clear()`` if resource modules are reloaded. The
+    returned dict is shared and must not be modified.
+
+    Args:
+        name: The name of the resource (e.g., "tenant", "service").
+
+    Returns:
+        A dict of method name to command metadata, parent methods first.
+
+    Raises:
+        DuploError: If the resource is not registered (not cached).
+    """
+    return _commander.commands_for(name)
+
+
+def extract_args(method) -> tuple:
+    """Get the duploctl Args a command accepts, cached per function.
+
+    ``duplocloud.commander.extract_args`` deep-copies every Arg on each
+    call. Each resource load binds fresh methods, so the cache is keyed on
+    the underlying function; inherited commands share one entry. The
+    returned Args are shared and must not be modified.
+
+    Args:
+        method: A command method, bound or not.
+
+    Returns:
+        A tuple of the command's Arg annotations.
+    """
+    return _extract_args(getattr(method, "__func__", method))
+
+
+@cache
+def _extract_args(func) -> tuple:
+    return tuple(_commander.extract_args(func))
+
+
+def json_bytes(data) -> bytes:
+    """Serialize data to compact UTF-8 JSON for HTTP responses.
+
+    Uses orjson when installed, otherwise the stdlib encoder with the same
+    settings as starlette's JSONResponse. The two agree on the str-keyed,
+    finite, 64-bit-integer payloads served here; they differ on NaN and
+    Infinity, non-str keys, and larger integers.
+
+    Args:
+        data: A JSON-serializable object.
+
+    Returns:
+        The encoded JSON body.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+# The only template variable duploctl docstrings use: {{kind}}, {{kind|lower}}
+_KIND_RE = re.compile(r"\{\{\s*kind\s*(\|\s*lower\s*)?\}\}")
+
 
+@lru_cache(maxsize=1024)
 def resolve_docstring_template(docstring: str, resource_name: str) -> str:
     """Resolve Jinja template variables in a docstring.
 
@@ -10,6 +205,10 @@ def resolve_docstring_template(docstring: str, resource_name: str) -> str:
     more generic and reusable across different resource types. This function
     resolves those templates with the actual resource kind.
 
+    ``{{kind}}`` and ``{{kind | lower}}`` are substituted directly; Jinja only
+    renders docstrings that use anything else. Results are cached, since
+    inherited commands share their docstring across resources.
+
     Args:
         docstring: The docstring with Jinja template variables.
         resource_name: The name of the resource (e.g., "service", "pod", "tenant").
@@ -22,22 +221,25 @@ def resolve_docstring_template(docstring: str, resource_name: str) -> str:
         >>> resolve_docstring_template(doc, "service")
         'List all service resources'
     """
-    if not docstring:
-        return docstring
+    # Every Jinja tag ({{ }}, {% %}, {# #}) contains "{"; most docstrings
+    # have none and can skip templating.
+    if not docstring or "{" not in docstring:
+        # Jinja drops one trailing newline; match it so output is the same
+        return docstring.removesuffix("\n")
 
-    # Create a Jinja template from the docstring
-    template = Template(docstring)
+    result = _KIND_RE.sub(
+        lambda m: resource_name.lower() if m.group(1) else resource_name,
+        docstring,
+    )
+    if "{" in result:
+        # Other template constructs: let Jinja render the original
+        return Template(docstring).render(kind=resource_name)
 
-    # Render the template with the resource kind
-    # The 'kind' variable is used in the templates as {{kind}} or {{kind | lower}}
-    result = template.render(kind=resource_name)
-
-    # if has_jinja:
-    #     print(f"     Output docstring (first 400 chars): {result[:400]}")
-
-    return result
+    # Jinja drops a single trailing newline; keep the output identical
+    return result.removesuffix("\n")
 
 
+@lru_cache(maxsize=4096)
 def get_docstring_summary(docstring: str) -> str:
     """Extract subject from a docstring.
 
@@ -50,16 +252,9 @@ def get_docstring_summary(docstring: str) -> str:
     if not docstring:
         return ""
 
-    # Split by double newlines to separate paragraphs
-    # 1. Subject
-    # 2. Description
-    # 3. ... (Args, etc.)
-    parts = docstring.strip().split('\n\n')
-
-    if not parts:
-        return ""
-
-    subject = parts[0].replace('\n', ' ').strip()
+    # The subject is the first paragraph; the description, Args, etc.
+    # follow after a blank line and are never looked at
+    subject = docstring.strip().partition('\n\n')[0].replace('\n', ' ').strip()
 
     if subject:
         return f" - {subject}"
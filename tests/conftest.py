@@ -2,9 +2,40 @@
 
 import re
 
+import httpx  # noqa: F401
 import pytest
 from fastmcp import FastMCP
 
+# Import the heavy modules during collection so their load time is not
+# charged to whichever test happens to run first.
+import duplocloud.mcp.config_display
+import duplocloud.mcp.server  # noqa: F401
+from duplocloud.mcp.tools import _build_params
+from duplocloud.mcp.utils import _extract_args, commands_for
+
+try:
+    # Optional, and unavailable on Windows; the stock loop works the same.
+    import uvloop
+except ImportError:
+    uvloop = None
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop when it is installed."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(autouse=True)
+def clear_command_caches():
+    """Drop per-function caches so results cached under one patch of
+    ``extract_args`` or ``commands_for`` do not leak into a test that
+    patches it differently.
+    """
+    yield
+    _build_params.cache_clear()
+    _extract_args.cache_clear()
+    commands_for.cache_clear()
+
 
 @pytest.fixture
 def mcp_instance():
@@ -12,7 +43,7 @@ def mcp_instance():
     return FastMCP(name="test-mcp", version="0.0.0")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def default_command_filter():
     """Default command filter that matches everything."""
     return re.compile(".*")
@@ -6,13 +6,20 @@ from duplocloud.mcp.ctx import (
     Ctx,
     _route_registry,
     _tool_registry,
+    ctx_free_signature,
     custom_route,
     custom_tool,
     drain_routes,
     drain_tools,
+    has_pending,
 )
 
 
+def _entries(registry):
+    """Flatten a mode-bucketed registry into its entries."""
+    return [e for bucket in registry.values() for e in bucket]
+
+
 @pytest.fixture(autouse=True)
 def clean_registries():
     """Ensure registries are empty before and after each test."""
@@ -45,6 +52,23 @@ class TestCtx:
         assert ctx.config["transport"] == "http"
         assert ctx.tools == ["tenant_list"]
 
+    def test_tools_sorted(self):
+        ctx = Ctx(duplo=None, tools=["tenant_list", "execute", "config"])
+        assert ctx.tools == ["config", "execute", "tenant_list"]
+
+    def test_command_re_compiled_from_config(self):
+        ctx = Ctx(duplo=None, config={"command_filter": "list|find"})
+        assert ctx.command_re.fullmatch("list")
+        assert not ctx.command_re.fullmatch("delete")
+
+    def test_command_re_defaults_to_match_all(self):
+        ctx = Ctx(duplo=None)
+        assert ctx.command_re.pattern == ".*"
+
+    def test_resource_set(self):
+        ctx = Ctx(duplo=None, resources=["tenant", "service"])
+        assert ctx.resource_set == frozenset({"tenant", "service"})
+
 
 # ---------------------------------------------------------------------------
 # @custom_tool decorator
@@ -57,22 +81,22 @@ class TestCustomToolDecorator:
         def my_tool(ctx):
             pass
 
-        assert len(_tool_registry) == 1
-        assert _tool_registry[0]["fn"] is my_tool
+        assert len(_entries(_tool_registry)) == 1
+        assert _entries(_tool_registry)[0]["fn"] is my_tool
 
     def test_default_name_from_function(self):
         @custom_tool()
         def some_name(ctx):
             pass
 
-        assert _tool_registry[0]["name"] == "some_name"
+        assert _entries(_tool_registry)[0]["name"] == "some_name"
 
     def test_explicit_name(self):
         @custom_tool(name="custom_name")
         def fn(ctx):
             pass
 
-        assert _tool_registry[0]["name"] == "custom_name"
+        assert _entries(_tool_registry)[0]["name"] == "custom_name"
 
     def test_default_description_from_docstring(self):
         @custom_tool()
@@ -80,7 +104,7 @@ class TestCustomToolDecorator:
             """My description."""
             pass
 
-        assert _tool_registry[0]["description"] == "My description."
+        assert _entries(_tool_registry)[0]["description"] == "My description."
 
     def test_explicit_description(self):
         @custom_tool(description="Overridden.")
@@ -88,21 +112,37 @@ class TestCustomToolDecorator:
             """Original."""
             pass
 
-        assert _tool_registry[0]["description"] == "Overridden."
+        assert _entries(_tool_registry)[0]["description"] == "Overridden."
 
     def test_mode_none_by_default(self):
         @custom_tool()
         def fn(ctx):
             pass
 
-        assert _tool_registry[0]["mode"] is None
+        assert _entries(_tool_registry)[0]["mode"] is None
 
     def test_mode_set(self):
         @custom_tool(mode="admin")
         def fn(ctx):
             pass
 
-        assert _tool_registry[0]["mode"] == "admin"
+        assert _entries(_tool_registry)[0]["mode"] == "admin"
+        assert list(_tool_registry) == ["admin"]  # bucketed by mode
+
+    def test_precomputes_ctx_free_signature(self):
+        @custom_tool()
+        def fn(ctx, name: str, count: int = 1):
+            pass
+
+        entry = _entries(_tool_registry)[0]
+        assert list(entry["signature"].parameters) == ["name", "count"]
+        assert entry["annotations"] == {"name": str, "count": int}
+
+    def test_ctx_free_signature_cached(self):
+        def fn(ctx, name: str):
+            pass
+
+        assert ctx_free_signature(fn) is ctx_free_signature(fn)
 
     def test_returns_original_function(self):
         @custom_tool()
@@ -123,24 +163,24 @@ class TestCustomRouteDecorator:
         async def my_route(ctx, request):
             pass
 
-        assert len(_route_registry) == 1
-        assert _route_registry[0]["fn"] is my_route
-        assert _route_registry[0]["path"] == "/test"
-        assert _route_registry[0]["methods"] == ["GET"]
+        assert len(_entries(_route_registry)) == 1
+        assert _entries(_route_registry)[0]["fn"] is my_route
+        assert _entries(_route_registry)[0]["path"] == "/test"
+        assert _entries(_route_registry)[0]["methods"] == ["GET"]
 
     def test_mode_none_by_default(self):
         @custom_route("/x", methods=["POST"])
         async def fn(ctx, request):
             pass
 
-        assert _route_registry[0]["mode"] is None
+        assert _entries(_route_registry)[0]["mode"] is None
 
     def test_mode_set(self):
         @custom_route("/x", methods=["GET"], mode="debug")
         async def fn(ctx, request):
             pass
 
-        assert _route_registry[0]["mode"] == "debug"
+        assert _entries(_route_registry)[0]["mode"] == "debug"
 
 
 # ---------------------------------------------------------------------------
@@ -160,7 +200,7 @@ class TestDrainTools:
 
         result = drain_tools()
         assert len(result) == 2
-        assert len(_tool_registry) == 0  # cleared
+        assert len(_entries(_tool_registry)) == 0  # cleared
 
     def test_drain_filters_by_mode(self):
         @custom_tool(mode="admin")
@@ -182,8 +222,15 @@ class TestDrainTools:
         assert "user_fn" not in names
 
         # user_fn should still be in the registry
-        assert len(_tool_registry) == 1
-        assert _tool_registry[0]["fn"].__name__ == "user_fn"
+        assert len(_entries(_tool_registry)) == 1
+        assert _entries(_tool_registry)[0]["fn"].__name__ == "user_fn"
+
+    def test_drain_orders_mode_agnostic_first(self):
+        for i in range(4):
+            custom_tool(name=f"t{i}", mode="admin" if i % 2 else None)(lambda ctx: None)
+
+        result = drain_tools(mode="admin")
+        assert [e["name"] for e in result] == ["t0", "t2", "t1", "t3"]
 
     def test_drain_is_idempotent(self):
         @custom_tool()
@@ -208,7 +255,7 @@ class TestDrainRoutes:
 
         result = drain_routes()
         assert len(result) == 2
-        assert len(_route_registry) == 0
+        assert len(_entries(_route_registry)) == 0
 
     def test_drain_filters_by_mode(self):
         @custom_route("/admin", methods=["GET"], mode="admin")
@@ -224,4 +271,41 @@ class TestDrainRoutes:
         assert "/admin" in paths
         assert "/public" in paths  # mode=None matches all
 
-        assert len(_route_registry) == 0
+        assert len(_entries(_route_registry)) == 0
+
+
+# ---------------------------------------------------------------------------
+# has_pending
+# ---------------------------------------------------------------------------
+
+class TestHasPending:
+
+    def test_empty_registries(self):
+        assert not has_pending()
+        assert not has_pending("admin")
+
+    @pytest.mark.parametrize("register", [
+        lambda: custom_tool(name="t")(lambda ctx: None),
+        lambda: custom_route("/r", methods=["GET"])(lambda ctx, req: None),
+    ], ids=["tool", "route"])
+    def test_mode_agnostic_entry_always_pending(self, register):
+        register()
+        assert has_pending()
+        assert has_pending("admin")
+
+    def test_other_mode_not_pending(self):
+        @custom_tool(mode="admin")
+        def admin_fn(ctx):
+            pass
+
+        assert has_pending("admin")
+        assert not has_pending("user")
+        assert not has_pending()
+
+    def test_false_after_drain(self):
+        @custom_tool(mode="admin")
+        def admin_fn(ctx):
+            pass
+
+        drain_tools(mode="admin")
+        assert not has_pending("admin")
@@ -4,13 +4,13 @@ Tests the server's register_custom flow, _inject_ctx, and the config
 display tool/route as a real consumer of the pattern.
 """
 
-import asyncio
 import inspect
-from unittest.mock import MagicMock, patch
+from types import MappingProxyType, SimpleNamespace
 
+import httpx
 import pytest
 from fastmcp import FastMCP
-from starlette.testclient import TestClient
+from starlette.responses import JSONResponse
 
 from duplocloud.mcp.config_display import build_config
 from duplocloud.mcp.ctx import (
@@ -21,28 +21,32 @@ from duplocloud.mcp.ctx import (
     custom_tool,
 )
 from duplocloud.mcp.server import DuploCloudMCP
+from duplocloud.mcp.utils import json_bytes
 
-
-def _make_server(mcp, mock_duplo):
-    """Create a DuploCloudMCP with a test FastMCP instance injected."""
-    server = DuploCloudMCP(mock_duplo)
-    server.mcp = mcp
-    return server
+# Sorted tool lists build_config is expected to report.
+_EXPECTED_TOOLS_DEFAULT = ("tenant_create", "tenant_find", "tenant_list")
+_EXPECTED_TOOLS_FILTERED = ("tenant_find", "tenant_list")
 
 
 @pytest.fixture(autouse=True)
 def clean_registries():
-    """Ensure registries are empty before and after each test."""
+    """Ensure registries are empty before and after each test.
+
+    Only the tests that register something leave entries behind, so the
+    teardown skips the clears when both registries are already empty.
+    """
     _tool_registry.clear()
     _route_registry.clear()
     yield
-    _tool_registry.clear()
-    _route_registry.clear()
+    if _tool_registry or _route_registry:
+        _tool_registry.clear()
+        _route_registry.clear()
 
 
-@pytest.fixture
+@pytest.fixture(scope="class")
 def mock_duplo():
-    duplo = MagicMock()
+    """A plain stand-in for DuploCtl with only what these tests read."""
+    duplo = SimpleNamespace(load_client=lambda name: None)
     duplo.host = "https://test.duplocloud.net"
     duplo.tenant = "default"
     duplo.config = {
@@ -59,12 +63,29 @@ def mock_duplo():
 
 
 @pytest.fixture
+def make_server(mock_duplo):
+    """Factory for a DuploCloudMCP with a fresh test FastMCP injected.
+
+    Returns:
+        A callable returning ``(mcp, server)``.
+    """
+    def _make():
+        mcp = FastMCP(name="test", version="0.0.0")
+        server = DuploCloudMCP(mock_duplo)
+        server.mcp = mcp
+        return mcp, server
+
+    return _make
+
+
+@pytest.fixture(scope="class")
 def ctx(mock_duplo):
+    """A read-only Ctx shared by the tests of a class."""
     return Ctx(
         duplo=mock_duplo,
-        config={"transport": "http", "port": 8000,
-                "resource_filter": ".*", "command_filter": ".*"},
-        tools=["tenant_list", "tenant_find", "tenant_create"],
+        config=MappingProxyType({"transport": "http", "port": 8000,
+                                 "resource_filter": ".*", "command_filter": ".*"}),
+        tools=("tenant_list", "tenant_find", "tenant_create"),
     )
 
 
@@ -72,16 +93,41 @@ def ctx(mock_duplo):
 # _inject_ctx
 # ---------------------------------------------------------------------------
 
-class TestInjectCtx:
+def _no_args(ctx: Ctx) -> dict:
+    return {}
+
+
+def _one_arg(ctx: Ctx, name: str = "x") -> dict:
+    return {"name": name}
 
-    def test_hides_ctx_from_signature(self, ctx):
-        def fn(ctx: Ctx, name: str = "test") -> dict:
-            return {"name": name}
 
+def _untyped_arg(ctx: Ctx, name="x", count: int = 1):
+    return None
+
+
+class TestInjectCtx:
+
+    @pytest.mark.parametrize("fn, expected", [
+        (_no_args, {}),
+        (_one_arg, {"name": str}),
+        (_untyped_arg, {"count": int}),
+    ], ids=["no-args", "one-arg", "untyped-arg"])
+    def test_signature_hides_ctx(self, ctx, fn, expected):
+        """The wrapper exposes every param but ctx, with annotations to match."""
         wrapper = DuploCloudMCP._inject_ctx(fn, ctx)
-        sig = inspect.signature(wrapper)
-        assert "ctx" not in sig.parameters
-        assert "name" in sig.parameters
+        params = list(inspect.signature(wrapper).parameters)
+
+        assert "ctx" not in params
+        assert params == [p for p in inspect.signature(fn).parameters if p != "ctx"]
+        assert wrapper.__annotations__ == expected
+
+    def test_signature_computed_once(self, ctx):
+        """inspect.signature returns the precomputed, shared __signature__."""
+        wrapper = DuploCloudMCP._inject_ctx(_one_arg, ctx)
+
+        assert inspect.signature(wrapper) is wrapper.__signature__
+        assert inspect.signature(wrapper) is inspect.signature(wrapper)
+        assert DuploCloudMCP._inject_ctx(_one_arg, ctx).__signature__ is wrapper.__signature__
 
     def test_injects_ctx_at_call_time(self, ctx):
         received = {}
@@ -105,22 +151,6 @@ class TestInjectCtx:
         assert wrapper.__name__ == "my_func"
         assert wrapper.__doc__ == "My docstring."
 
-    def test_no_extra_params_for_zero_arg_tool(self, ctx):
-        def fn(ctx: Ctx) -> dict:
-            return {}
-
-        wrapper = DuploCloudMCP._inject_ctx(fn, ctx)
-        sig = inspect.signature(wrapper)
-        assert len(sig.parameters) == 0
-
-    def test_annotations_exclude_ctx(self, ctx):
-        def fn(ctx: Ctx, name: str = "x") -> dict:
-            return {}
-
-        wrapper = DuploCloudMCP._inject_ctx(fn, ctx)
-        assert "ctx" not in wrapper.__annotations__
-        assert wrapper.__annotations__.get("name") is str
-
 
 # ---------------------------------------------------------------------------
 # register_custom (integration with FastMCP)
@@ -128,23 +158,22 @@ class TestInjectCtx:
 
 class TestRegisterCustom:
 
-    def test_custom_tool_registered_on_mcp(self, mock_duplo):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_custom_tool_registered_on_mcp(self, make_server):
         """A @custom_tool function ends up as a FastMCP tool."""
         @custom_tool(name="test_tool", description="A test.")
         def test_tool(ctx: Ctx):
             return {"ok": True}
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
+        mcp, server = make_server()
 
         server.register_custom()
 
         # Verify it's registered
-        tools = asyncio.run(mcp.list_tools())
-        names = [t.name for t in tools]
-        assert "test_tool" in names
+        assert await mcp.get_tool("test_tool") is not None
 
-    def test_custom_tool_ctx_injected(self, mock_duplo):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_custom_tool_ctx_injected(self, make_server, mock_duplo):
         """When the tool is called, ctx is injected."""
         received_ctx = {}
 
@@ -153,15 +182,16 @@ class TestRegisterCustom:
             received_ctx["duplo"] = ctx.duplo
             return "spied"
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
+        mcp, server = make_server()
         server.register_custom()
 
-        # Call the tool through FastMCP
-        result = asyncio.run(mcp.call_tool("spy_tool", {}))
+        # The registered callable is the sync ctx-injecting wrapper
+        tool = await mcp.get_tool("spy_tool")
+        assert tool.fn() == "spied"
         assert received_ctx["duplo"] is mock_duplo
 
-    def test_mode_filter_on_custom_tool(self, mock_duplo):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_mode_filter_on_custom_tool(self, make_server):
         """Tools with non-matching mode are not registered."""
         @custom_tool(name="admin_only", mode="admin")
         def admin_tool(ctx: Ctx):
@@ -171,30 +201,72 @@ class TestRegisterCustom:
         def always_tool(ctx: Ctx):
             return "always"
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
+        mcp, server = make_server()
 
         # Register with mode="user" — admin_only should not match
         server.register_custom(mode="user")
 
-        tools = asyncio.run(mcp.list_tools())
-        names = [t.name for t in tools]
-        assert "always" in names
-        assert "admin_only" not in names
+        assert await mcp.get_tool("always") is not None
+        assert await mcp.get_tool("admin_only") is None
 
-    def test_custom_tool_with_extra_params(self, mock_duplo):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_custom_tool_with_extra_params(self, make_server):
         """Tool params beyond ctx are visible to FastMCP."""
         @custom_tool(name="greeter")
         def greet(ctx: Ctx, name: str = "world"):
             return f"hello {name}"
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
+        mcp, server = make_server()
         server.register_custom()
 
-        result = asyncio.run(mcp.call_tool("greeter", {"name": "duplo"}))
-        # FastMCP wraps results; just check it didn't error
-        assert result is not None
+        tool = await mcp.get_tool("greeter")
+        assert list(tool.parameters["properties"]) == ["name"]
+        assert tool.fn(name="duplo") == "hello duplo"
+
+    def test_noop_on_empty_registries(self, make_server):
+        """With nothing registered, no Ctx is built and nothing is added."""
+        _, server = make_server()
+        server.register_custom()
+        assert server._ctx is None
+        assert server._list_tool_names() == []
+
+    def test_noop_when_only_other_modes_pending(self, make_server):
+        """Entries for another mode stay queued without building a Ctx."""
+        @custom_tool(name="admin_only", mode="admin")
+        def admin_tool(ctx: Ctx):
+            return "admin"
+
+        _, server = make_server()
+        server.register_custom(mode="user")
+        assert server._ctx is None
+        assert server._list_tool_names() == []
+
+    def test_ctx_tools_omit_direct_fastmcp_tools(self, make_server):
+        """Only tools the server registered are listed, not ones added on mcp."""
+        mcp, server = make_server()
+        mcp.tool(name="direct_tool")(lambda: "direct")
+
+        @custom_tool(name="listed_tool")
+        def listed(ctx: Ctx):
+            return "listed"
+
+        server.register_custom()
+        assert server._build_ctx().tools == ["listed_tool"]
+
+    def test_ctx_reused_until_tools_change(self, make_server):
+        """The Ctx snapshot is rebuilt only after registration changes it."""
+        _, server = make_server()
+        ctx = server._build_ctx()
+        assert server._build_ctx() is ctx
+
+        @custom_tool(name="late_tool")
+        def late(ctx: Ctx):
+            return "late"
+
+        server.register_custom()
+        rebuilt = server._build_ctx()
+        assert rebuilt is not ctx
+        assert "late_tool" in rebuilt.tools
 
 
 # ---------------------------------------------------------------------------
@@ -204,81 +276,89 @@ class TestRegisterCustom:
 class TestCustomRoutes:
     """Verify @custom_route functions are reachable via HTTP."""
 
-    def test_route_responds(self, mock_duplo):
-        """A @custom_route handler is reachable at its path."""
-        @custom_route("/ping", methods=["GET"])
+    @pytest.fixture
+    def get(self):
+        """Issue a GET against an ASGI app in the test's own event loop."""
+        async def _get(app, path):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://t"
+            ) as client:
+                return await client.get(path)
+        return _get
+
+    @pytest.mark.parametrize("route_mode,serve_mode,want_status", [
+        (None, None, 200),
+        ("admin", "admin", 200),
+        ("admin", "user", 404),  # mode mismatch: route is skipped
+    ])
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_route_reachable_by_mode(self, make_server, get,
+                                           route_mode, serve_mode, want_status):
+        """A @custom_route is served only when its mode matches."""
+        @custom_route("/ping", methods=["GET"], mode=route_mode)
         async def ping_route(ctx: Ctx, request):
-            from starlette.responses import JSONResponse
             return JSONResponse({"pong": True})
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
-        server.register_custom()
+        mcp, server = make_server()
+        server.register_custom(mode=serve_mode)
 
-        client = TestClient(mcp.http_app(), raise_server_exceptions=True)
-        resp = client.get("/ping")
-        assert resp.status_code == 200
-        assert resp.json() == {"pong": True}
+        resp = await get(mcp.http_app(), "/ping")
+        assert resp.status_code == want_status
+        if want_status == 200:
+            assert resp.json() == {"pong": True}
 
-    def test_route_ctx_injected(self, mock_duplo):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_route_ctx_injected(self, make_server, mock_duplo, get):
         """The ctx object is available inside the route handler."""
         received = {}
 
         @custom_route("/spy", methods=["GET"])
         async def spy_route(ctx: Ctx, request):
-            from starlette.responses import JSONResponse
             received["duplo"] = ctx.duplo
             return JSONResponse({"tenant": ctx.duplo.tenant})
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
+        mcp, server = make_server()
         server.register_custom()
 
-        client = TestClient(mcp.http_app(), raise_server_exceptions=True)
-        resp = client.get("/spy")
+        resp = await get(mcp.http_app(), "/spy")
         assert resp.status_code == 200
         assert resp.json()["tenant"] == "default"
         assert received["duplo"] is mock_duplo
 
-    def test_config_route_returns_200(self, mock_duplo):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_config_route_returns_200(self, make_server, get):
         """The built-in /config route returns 200 with JSON."""
         # config_display is already imported (Python caches modules), so the
         # decorators don't re-run. Manually push the real config_route entry
         # into the registry that the autouse fixture cleared.
         from duplocloud.mcp.config_display import config_route
-        _route_registry.append({
+        _route_registry.setdefault(None, []).append({
             "fn": config_route,
             "path": "/config",
             "methods": ["GET"],
             "mode": None,
         })
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
+        mcp, server = make_server()
         server.register_custom()
 
-        client = TestClient(mcp.http_app(), raise_server_exceptions=True)
-        resp = client.get("/config")
+        resp = await get(mcp.http_app(), "/config")
         assert resp.status_code == 200
         body = resp.json()
         assert "Tools" in body
         assert "MCP" in body
         assert "Host" in body
 
-    def test_route_mode_filter_not_registered(self, mock_duplo):
-        """Route with non-matching mode is not reachable."""
-        @custom_route("/secret", methods=["GET"], mode="admin")
-        async def secret_route(ctx: Ctx, request):
-            from starlette.responses import JSONResponse
-            return JSONResponse({"secret": True})
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_health_route(self, get):
+        """The global app serves a constant /health payload."""
+        from duplocloud.mcp import app
 
-        mcp = FastMCP(name="test", version="0.0.0")
-        server = _make_server(mcp, mock_duplo)
-        server.register_custom(mode="user")  # "admin" route should be skipped
-
-        client = TestClient(mcp.http_app(), raise_server_exceptions=False)
-        resp = client.get("/secret")
-        assert resp.status_code == 404
+        resp = await get(app.mcp.http_app(), "/health")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json() == {"status": "healthy", "service": "duplocloud-mcp"}
 
 
 # ---------------------------------------------------------------------------
@@ -304,7 +384,7 @@ class TestBuildConfig:
 
     def test_tools_sorted(self, ctx):
         result = build_config(ctx)
-        assert result["Tools"] == ["tenant_create", "tenant_find", "tenant_list"]
+        assert tuple(result["Tools"]) == _EXPECTED_TOOLS_DEFAULT
 
     def test_mcp_config(self, ctx):
         result = build_config(ctx)
@@ -327,10 +407,50 @@ class TestBuildConfig:
         result = build_config(ctx)
         assert result["MCP"]["resource_filter"] == "tenant"
         assert result["MCP"]["command_filter"] == "list|find"
-        assert result["Tools"] == ["tenant_find", "tenant_list"]
+        assert tuple(result["Tools"]) == _EXPECTED_TOOLS_FILTERED
+
+    def test_cached_per_ctx(self, ctx, mock_duplo):
+        """The payload is built once per Ctx; a new Ctx rebuilds it."""
+        first = build_config(ctx)
+        assert build_config(ctx) is first
+
+        fresh = Ctx(duplo=mock_duplo, config=ctx.config, tools=["tenant_list"])
+        assert build_config(fresh)["Tools"] == ["tenant_list"]
 
     def test_does_not_mutate_duplo_config(self, ctx):
         """build_config must not modify the original duplo.config."""
-        original = dict(ctx.duplo.config)
+        before = tuple(sorted(ctx.duplo.config.items()))
         build_config(ctx)
-        assert ctx.duplo.config == original
+        assert tuple(sorted(ctx.duplo.config.items())) == before
+
+
+# ---------------------------------------------------------------------------
+# json_bytes (route serialization)
+# ---------------------------------------------------------------------------
+
+_JSON_PAYLOAD = {"Host": "https://tést", "Tools": ["a", "b"], "MCP": {"port": 8000}}
+
+
+class TestJsonBytes:
+
+    def test_matches_json_response(self):
+        """Output is byte-identical to starlette's JSONResponse body."""
+        assert json_bytes(_JSON_PAYLOAD) == JSONResponse(_JSON_PAYLOAD).body
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Without orjson installed the stdlib encoder gives the same bytes."""
+        monkeypatch.setattr("duplocloud.mcp.utils.orjson", None)
+        assert json_bytes(_JSON_PAYLOAD) == JSONResponse(_JSON_PAYLOAD).body
+
+    def test_orjson_matches_stdlib(self, monkeypatch):
+        """Both encoders give the same bytes for the payloads served here."""
+        pytest.importorskip("orjson")
+        fast = json_bytes(_JSON_PAYLOAD)
+        monkeypatch.setattr("duplocloud.mcp.utils.orjson", None)
+        assert json_bytes(_JSON_PAYLOAD) == fast
+
+    def test_stdlib_rejects_nan(self, monkeypatch):
+        """Like JSONResponse, the stdlib path refuses non-finite floats."""
+        monkeypatch.setattr("duplocloud.mcp.utils.orjson", None)
+        with pytest.raises(ValueError):
+            json_bytes({"x": float("nan")})
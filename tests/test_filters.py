@@ -1,76 +1,105 @@
 """Tests for filter matching behavior.
 
-These tests operate directly on compiled regex via re.fullmatch -- no server
-instance needed. Pure unit tests verifying the filtering contract.
+These tests run each case through re.fullmatch and through compile_filter's
+fast paths -- no server instance needed. Pure unit tests verifying the
+filtering contract.
 """
 
 import re
+from functools import lru_cache
 
 import pytest
 
-
-class TestResourceFilter:
-    """Verify resource filter patterns match as expected."""
-
-    def test_default_matches_everything(self):
-        pattern = re.compile(".*")
-        assert pattern.fullmatch("service")
-        assert pattern.fullmatch("tenant")
-        assert pattern.fullmatch("anything")
-
-    def test_exact_match(self):
-        pattern = re.compile("service")
-        assert pattern.fullmatch("service")
-
-    def test_exact_non_match(self):
-        pattern = re.compile("service")
-        assert not pattern.fullmatch("tenant")
-
-    def test_alternation(self):
-        pattern = re.compile("service|lambda|s3")
-        assert pattern.fullmatch("lambda")
-        assert pattern.fullmatch("service")
-        assert pattern.fullmatch("s3")
-
-    def test_alternation_non_match(self):
-        pattern = re.compile("service|lambda|s3")
-        assert not pattern.fullmatch("tenant")
-
-    def test_regex_wildcard(self):
-        pattern = re.compile("batch_.*")
-        assert pattern.fullmatch("batch_compute")
-        assert pattern.fullmatch("batch_anything")
-
-    def test_regex_wildcard_non_match(self):
-        pattern = re.compile("batch_.*")
-        assert not pattern.fullmatch("service")
-
-    def test_partial_should_not_match(self):
-        """fullmatch requires the entire string to match."""
-        pattern = re.compile("serv")
-        assert not pattern.fullmatch("service")
-
-
-class TestCommandFilter:
-    """Verify command filter patterns match as expected."""
-
-    def test_exact_command(self):
-        pattern = re.compile("create")
+from duplocloud.mcp.utils import MATCH_ALL, compile_filter
+
+# Compile each pattern once for the whole module
+_compiled = lru_cache(maxsize=None)(re.compile)
+
+# (pattern, name, matches) -- resource filter cases, then command filter
+FULLMATCH_CASES = [
+    (".*", "service", True),
+    (".*", "tenant", True),
+    (".*", "anything", True),
+    ("service", "service", True),
+    ("service", "tenant", False),
+    ("service|lambda|s3", "lambda", True),
+    ("service|lambda|s3", "service", True),
+    ("service|lambda|s3", "s3", True),
+    ("service|lambda|s3", "tenant", False),
+    ("batch_.*", "batch_compute", True),
+    ("batch_.*", "batch_anything", True),
+    ("batch_.*", "service", False),
+    ("serv", "service", False),  # fullmatch requires the entire string
+    ("create", "create", True),
+    ("create|delete|update", "create", True),
+    ("create|delete|update", "delete", True),
+    ("create|delete|update", "update", True),
+    ("create|delete|update", "list", False),
+    (".*", "create", True),
+    (".*", "list", True),
+    (".*", "find", True),
+    (".*", "delete", True),
+    ("list|list_all", "list_all", True),  # alternation backtracks
+]
+
+
+@pytest.mark.parametrize("pattern, name, matches", FULLMATCH_CASES)
+def test_fullmatch(pattern, name, matches):
+    """Resource and command filters match whole names only."""
+    assert bool(_compiled(pattern).fullmatch(name)) is matches
+
+
+@pytest.mark.parametrize("pattern, name, matches", FULLMATCH_CASES)
+def test_compile_filter_fullmatch(pattern, name, matches):
+    """The filters the server builds honor the same whole-name contract."""
+    assert bool(compile_filter(pattern).fullmatch(name)) is matches
+
+
+class TestCompileFilter:
+    """Verify compile_filter, which builds the server's filters."""
+
+    def test_default_is_match_all(self):
+        assert compile_filter(".*") is MATCH_ALL
+        assert MATCH_ALL.pattern == ".*"
+        assert MATCH_ALL.fullmatch("anything")
+        assert not MATCH_ALL.fullmatch("any\nthing")
+
+    def test_pattern_compiled(self):
+        pattern = compile_filter("cre.te|delete")
+        assert isinstance(pattern, re.Pattern)
         assert pattern.fullmatch("create")
-
-    def test_command_alternation(self):
-        pattern = re.compile("create|delete|update")
-        assert pattern.fullmatch("create")
-        assert pattern.fullmatch("delete")
-        assert pattern.fullmatch("update")
-
-    def test_command_alternation_non_match(self):
-        pattern = re.compile("create|delete|update")
         assert not pattern.fullmatch("list")
 
-    def test_default_matches_all_commands(self):
-        pattern = re.compile(".*")
-        assert pattern.fullmatch("create")
-        assert pattern.fullmatch("list")
-        assert pattern.fullmatch("find")
-        assert pattern.fullmatch("delete")
+    @pytest.mark.parametrize("pattern", [
+        "create|delete", "^(create|delete)$", "(create|delete)",
+    ])
+    def test_literal_names_skip_regex(self, pattern):
+        compiled = compile_filter(pattern)
+        assert not isinstance(compiled, re.Pattern)
+        assert compiled.pattern == pattern
+        assert compiled.fullmatch("create")
+        assert compiled.fullmatch("delete")
+        assert not compiled.fullmatch("created")
+        assert not compiled.fullmatch("list")
+
+    def test_prefix_skips_regex(self):
+        compiled = compile_filter("aws.*")
+        assert not isinstance(compiled, re.Pattern)
+        assert compiled.fullmatch("aws")
+        assert compiled.fullmatch("aws_secret")
+        assert not compiled.fullmatch("batch_aws")
+        assert not compiled.fullmatch("aws\nfoo")
+
+    @pytest.mark.parametrize("pattern", [
+        ".*", "tenant|service", "^(create|delete)$", "aws.*", "list|find.*", "(a)|(b)",
+    ])
+    @pytest.mark.parametrize("name", [
+        "tenant", "service", "create", "delete", "aws", "aws_x", "list",
+        "find", "findall", "a", "b", "", "ten", "aws\nx", "list\nfoo", "tenant\n",
+    ])
+    def test_agrees_with_regex(self, pattern, name):
+        expected = re.fullmatch(pattern, name) is not None
+        assert bool(compile_filter(pattern).fullmatch(name)) is expected
+
+    def test_compiled_once(self):
+        assert compile_filter("tenant|service") is compile_filter("tenant|service")
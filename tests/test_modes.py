@@ -4,19 +4,26 @@ Uses the tenant resource as the primary use case since it's the only
 resource with a model annotation (AddTenantRequest on create).
 """
 
-import asyncio
 import inspect
-import re
+from types import MappingProxyType, SimpleNamespace
 from typing import Optional
-from unittest.mock import MagicMock, patch
+from unittest.mock import Mock, patch
 
 import pytest
+import pytest_asyncio
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field
 
 from duplocloud.mcp.tools import ToolRegistrar
-from duplocloud.mcp.compact_tools import execute, explain_resource, explain_command, resources
+from duplocloud.mcp.compact_tools import (
+    _body_schema,
+    execute,
+    explain_command,
+    explain_resource,
+    resources,
+)
 from duplocloud.mcp.ctx import Ctx
+from duplocloud.mcp.server import DuploCloudMCP
 
 
 # ---------------------------------------------------------------------------
@@ -29,16 +36,23 @@ class FakeModel(BaseModel):
     account_name: Optional[str] = Field(None, alias="AccountName")
 
 
+# Shared, read-only Arg.attributes for the fakes below
+_NO_ATTRS = MappingProxyType({})
+_BODY_DEST = MappingProxyType({"dest": "body"})
+
+
 class FakeArg:
-    """Mimics duploctl Arg type."""
-    def __init__(self, name, supertype=str, dest=None, help_text=""):
+    """Mimics duploctl Arg type.
+
+    Slotted, with a shared read-only ``attributes`` mapping, since the
+    code under test only reads these.
+    """
+    __slots__ = ("__name__", "__supertype__", "attributes")
+
+    def __init__(self, name, supertype=str, attributes=_NO_ATTRS):
         self.__name__ = name
         self.__supertype__ = supertype
-        self.attributes = {}
-        if dest:
-            self.attributes["dest"] = dest
-        if help_text:
-            self.attributes["help"] = help_text
+        self.attributes = attributes
 
     @property
     def type_name(self):
@@ -58,163 +72,169 @@ TENANT_COMMANDS = {
 }
 
 
-def _make_fake_methods():
-    """Build real functions simulating bound methods (no self param)."""
-    call_log = []
+# Real functions simulating bound methods (no self param)
+def fake_list():
+    """list doc"""
+    return []
+
 
-    def fake_list():
-        """list doc"""
-        call_log.append(("list",))
-        return []
+def fake_find(name=""):
+    """find doc"""
+    return {"Name": name}
 
-    def fake_find(name=""):
-        """find doc"""
-        call_log.append(("find", name))
-        return {"Name": name}
 
-    def fake_create(body=None):
-        """create doc"""
-        call_log.append(("create", body))
-        return {"ok": True}
+def fake_create(body=None):
+    """create doc"""
+    return {"ok": True}
 
-    def fake_delete(name=""):
-        """delete doc"""
-        call_log.append(("delete", name))
-        return {"deleted": True}
 
-    return {
-        "list": fake_list,
-        "find": fake_find,
-        "create": fake_create,
-        "delete": fake_delete,
-    }, call_log
+def fake_delete(name=""):
+    """delete doc"""
+    return {"deleted": True}
+
+
+_FAKE_METHODS = {
+    "list": fake_list,
+    "find": fake_find,
+    "create": fake_create,
+    "delete": fake_delete,
+}
 
 
 def _make_mock_resource(commands_dict):
-    """Build a mock resource object with real functions matching commands."""
-    resource = MagicMock()
-    methods, call_log = _make_fake_methods()
-    for method_name in commands_dict:
-        if method_name in methods:
-            setattr(resource, method_name, methods[method_name])
-    resource._call_log = call_log
-    return resource
+    """Build a fake resource object with real functions matching commands."""
+    return SimpleNamespace(
+        **{name: _FAKE_METHODS[name] for name in commands_dict if name in _FAKE_METHODS}
+    )
 
 
-def _make_mock_duplo():
-    """Build a mock DuploClient for expanded mode tests."""
-    duplo = MagicMock()
-    resource = _make_mock_resource(TENANT_COMMANDS)
-    duplo.load.return_value = resource
-    duplo.load_model.side_effect = lambda name: FakeModel if name == "AddTenantRequest" else None
-    duplo.validate_model.side_effect = lambda model, data: model().model_dump()
+def _stub_duplo():
+    """A plain client stand-in for tests that never reach the client."""
+    return SimpleNamespace(query=None, output="json", wait=False, load=lambda _: None)
+
+
+def _recording_duplo(result="ok"):
+    """A callable client stand-in that records each dispatch in ``calls``."""
+    calls = []
+
+    def duplo(*args, **kwargs):
+        calls.append((args, kwargs))
+        return result
+
+    duplo.wait = False
+    duplo.calls = calls
     return duplo
 
 
-def _get_tool_names(mcp):
-    """Get tool names from a FastMCP instance."""
-    tools = asyncio.run(mcp.list_tools())
-    return {t.name for t in tools}
+def _documented(doc):
+    """A plain function carrying *doc*, standing in for a resource method."""
+    def method():
+        pass
+    method.__doc__ = doc
+    return method
+
+
+def _load_model(name):
+    return FakeModel if name == "AddTenantRequest" else None
+
+
+# validate_model's result never varies, so dump the fake model once.
+_FAKE_MODEL_DUMP = FakeModel().model_dump()
+
+
+def _validate_model(model, data):
+    return _FAKE_MODEL_DUMP
+
 
+def _make_mock_duplo():
+    """Build a mock DuploClient for expanded mode tests."""
+    duplo = Mock()
+    duplo.load.return_value = _make_mock_resource(TENANT_COMMANDS)
+    duplo.load_model.side_effect = _load_model
+    duplo.validate_model.side_effect = _validate_model
+    return duplo
 
-def _get_tool(mcp, name):
-    """Get a FunctionTool from a FastMCP instance by name."""
-    return asyncio.run(mcp.get_tool(name))
 
+# Fake extract_args results for tenant methods
+_TENANT_ARGS = {
+    "list": [],
+    "find": [FakeArg("name", str)],
+    "create": [FakeArg("file", dict, _BODY_DEST)],
+    "delete": [FakeArg("name", str)],
+}
 
-def _patch_extract_args(args_map):
-    """Return a side_effect for extract_args that returns args based on the method's __doc__."""
-    lookup = {f"{name} doc": a for name, a in args_map.items()}
+# Keyed on the fake method objects themselves, which the registrar passes in.
+_TENANT_ARGS_LOOKUP = {_FAKE_METHODS[name]: a for name, a in _TENANT_ARGS.items()}
 
-    def _extract(method):
-        doc = getattr(method, "__doc__", "")
-        return lookup.get(doc, [])
 
-    return _extract
+def _extract_tenant_args(method):
+    """Stand-in for extract_args that returns the args for a fake method."""
+    return _TENANT_ARGS_LOOKUP.get(method, [])
 
 
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_duplo():
+    """A mock DuploClient, shared by the module's read-only registration."""
     return _make_mock_duplo()
 
 
-@pytest.fixture
-def default_filter():
-    return re.compile(".*")
-
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def tenant_args():
     """Fake extract_args results for tenant methods."""
-    return {
-        "list": [],
-        "find": [FakeArg("name", str)],
-        "create": [FakeArg("file", dict, dest="body")],
-        "delete": [FakeArg("name", str)],
-    }
+    return _TENANT_ARGS
 
 
 # ---------------------------------------------------------------------------
 # Expanded Mode Tests
 # ---------------------------------------------------------------------------
 
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def expanded_tenant(mock_duplo, default_command_filter):
+    """Register every tenant command once, with each tool's signature."""
+    mcp = FastMCP(name="test-expanded", version="0.0.0")
+    registrar = ToolRegistrar(mcp, mock_duplo, default_command_filter)
+    with patch("duplocloud.mcp.tools.commands_for", return_value=TENANT_COMMANDS), \
+         patch("duplocloud.mcp.tools.extract_args", side_effect=_extract_tenant_args):
+        registrar.register_resource("tenant")
+
+    tools = {t.name: t for t in await mcp.list_tools()}
+    return SimpleNamespace(
+        registrar=registrar,
+        tools=tools,
+        signatures={name: inspect.signature(t.fn) for name, t in tools.items()},
+    )
+
+
 class TestExpandedMode:
     """Expanded mode: one tool per resource+command."""
 
-    def test_tenant_create_gets_model_annotation(self, mcp_instance, mock_duplo, default_filter, tenant_args):
+    def test_tenant_create_gets_model_annotation(self, expanded_tenant):
         """In expanded mode, tenant_create body param uses AddTenantRequest model."""
-        registrar = ToolRegistrar(mcp_instance, mock_duplo, default_filter)
-
-        with patch("duplocloud.mcp.tools.commands_for", return_value=TENANT_COMMANDS), \
-             patch("duplocloud.mcp.tools.extract_args", side_effect=_patch_extract_args(tenant_args)):
-            registrar.register_resource("tenant")
-
-        tool = _get_tool(mcp_instance, "tenant_create")
-        sig = inspect.signature(tool.fn)
-        assert "body" in sig.parameters
-        assert sig.parameters["body"].annotation is FakeModel
+        params = expanded_tenant.signatures["tenant_create"].parameters
+        assert "body" in params
+        assert params["body"].annotation is FakeModel
 
-    def test_tenant_find_no_model(self, mcp_instance, mock_duplo, default_filter, tenant_args):
+    def test_tenant_find_no_model(self, expanded_tenant):
         """In expanded mode, tenant_find (no model) has str annotation for name."""
-        registrar = ToolRegistrar(mcp_instance, mock_duplo, default_filter)
+        params = expanded_tenant.signatures["tenant_find"].parameters
+        assert "name" in params
+        assert params["name"].annotation is str
 
-        with patch("duplocloud.mcp.tools.commands_for", return_value={"find": TENANT_COMMANDS["find"]}), \
-             patch("duplocloud.mcp.tools.extract_args", side_effect=_patch_extract_args(tenant_args)):
-            registrar.register_resource("tenant")
-
-        tool = _get_tool(mcp_instance, "tenant_find")
-        sig = inspect.signature(tool.fn)
-        assert "name" in sig.parameters
-        assert sig.parameters["name"].annotation is str
-
-    def test_tenant_list_no_params(self, mcp_instance, mock_duplo, default_filter, tenant_args):
+    def test_tenant_list_no_params(self, expanded_tenant):
         """In expanded mode, tenant_list has no user-facing params."""
-        registrar = ToolRegistrar(mcp_instance, mock_duplo, default_filter)
-
-        with patch("duplocloud.mcp.tools.commands_for", return_value={"list": TENANT_COMMANDS["list"]}), \
-             patch("duplocloud.mcp.tools.extract_args", return_value=[]):
-            registrar.register_resource("tenant")
+        assert expanded_tenant.signatures["tenant_list"].parameters == {}
 
-        tool_names = _get_tool_names(mcp_instance)
-        assert "tenant_list" in tool_names
-
-    def test_expanded_registers_prefixed_names(self, mcp_instance, mock_duplo, default_filter, tenant_args):
+    def test_expanded_registers_prefixed_names(self, expanded_tenant):
         """Expanded mode tools are named {resource}_{command}."""
-        registrar = ToolRegistrar(mcp_instance, mock_duplo, default_filter)
-
-        with patch("duplocloud.mcp.tools.commands_for", return_value=TENANT_COMMANDS), \
-             patch("duplocloud.mcp.tools.extract_args", side_effect=_patch_extract_args(tenant_args)):
-            registrar.register_resource("tenant")
+        assert set(expanded_tenant.tools) == {f"tenant_{cmd}" for cmd in TENANT_COMMANDS}
 
-        tool_names = _get_tool_names(mcp_instance)
-        assert "tenant_create" in tool_names
-        assert "tenant_find" in tool_names
-        assert "tenant_list" in tool_names
-        assert "tenant_delete" in tool_names
+    def test_registrar_tracks_tool_names(self, expanded_tenant):
+        """The registrar records what it registered, matching FastMCP's view."""
+        assert set(expanded_tenant.registrar.tool_names) == set(expanded_tenant.tools)
 
 
 # ---------------------------------------------------------------------------
@@ -226,7 +246,7 @@ class TestCompactExecute:
 
     @staticmethod
     def _make_ctx(duplo, resource_list=None):
-        if not hasattr(duplo, 'wait') or isinstance(duplo.wait, MagicMock):
+        if not hasattr(duplo, 'wait') or isinstance(duplo.wait, Mock):
             duplo.wait = False
         return Ctx(
             duplo=duplo,
@@ -237,39 +257,37 @@ class TestCompactExecute:
 
     def test_execute_dispatches_with_body(self):
         """Execute passes body as a kwarg through duplo()."""
-        duplo = MagicMock()
-        duplo.__call__ = MagicMock(return_value={"ok": True})
+        duplo = _recording_duplo({"ok": True})
 
         ctx = self._make_ctx(duplo)
         execute(ctx, resource="tenant", command="create", body={"AccountName": "test"})
 
-        duplo.assert_called_with("tenant", "create", query=None, body={"AccountName": "test"})
+        assert duplo.calls[-1] == (("tenant", "create"),
+                                   {"query": None, "body": {"AccountName": "test"}})
 
     def test_execute_dispatches_with_name(self):
         """Execute passes name as a kwarg through duplo()."""
-        duplo = MagicMock()
-        duplo.__call__ = MagicMock(return_value="found-it")
+        duplo = _recording_duplo("found-it")
 
         ctx = self._make_ctx(duplo)
         execute(ctx, resource="tenant", command="find", name="my-tenant")
 
-        duplo.assert_called_with("tenant", "find", query=None, name="my-tenant")
+        assert duplo.calls[-1] == (("tenant", "find"), {"query": None, "name": "my-tenant"})
 
     def test_execute_dispatches_with_args_dict(self):
         """Execute passes args dict entries as kwargs through duplo()."""
-        duplo = MagicMock()
-        duplo.__call__ = MagicMock(return_value="ok")
+        duplo = _recording_duplo("ok")
 
         ctx = self._make_ctx(duplo)
         execute(ctx, resource="service", command="update_image",
                 args={"name": "my-svc", "image": "nginx:latest"})
 
-        duplo.assert_called_with("service", "update_image", query=None,
-                                 name="my-svc", image="nginx:latest")
+        assert duplo.calls[-1] == (("service", "update_image"),
+                                   {"query": None, "name": "my-svc", "image": "nginx:latest"})
 
     def test_execute_respects_resource_filter(self):
         """Execute rejects resources not in ctx.resources."""
-        duplo = MagicMock()
+        duplo = _stub_duplo()
 
         ctx = self._make_ctx(duplo, resource_list=["tenant"])
         result = execute(ctx, resource="service", command="list")
@@ -278,8 +296,7 @@ class TestCompactExecute:
 
     def test_execute_respects_command_filter(self):
         """Execute rejects commands that don't match the command filter."""
-        duplo = MagicMock()
-        duplo.wait = False
+        duplo = _stub_duplo()
 
         ctx = Ctx(
             duplo=duplo,
@@ -294,17 +311,16 @@ class TestCompactExecute:
 
     def test_execute_passes_query_to_duplo(self):
         """Execute passes query through to duplo() as a keyword arg."""
-        duplo = MagicMock()
-        duplo.__call__ = MagicMock(return_value="[]")
+        duplo = _recording_duplo("[]")
 
         ctx = self._make_ctx(duplo)
         execute(ctx, resource="tenant", command="list", query="[].Name")
 
-        duplo.assert_called_with("tenant", "list", query="[].Name")
+        assert duplo.calls[-1] == (("tenant", "list"), {"query": "[].Name"})
 
     def test_execute_sets_wait_toggle(self):
         """Execute sets duplo.wait to the provided value."""
-        duplo = MagicMock()
+        duplo = Mock()
         duplo.wait = False
 
         captured = {}
@@ -318,21 +334,42 @@ class TestCompactExecute:
 
         assert captured["wait"] is True
 
+    def test_execute_restores_wait(self):
+        """The wait override only lasts for the dispatched command."""
+        duplo = Mock()
+        duplo.wait = False
+        duplo.side_effect = Exception("boom")
+
+        ctx = self._make_ctx(duplo)
+        execute(ctx, resource="tenant", command="list", wait=True)
+
+        assert duplo.wait is False
+
+    def test_execute_rejected_leaves_wait_untouched(self):
+        """Calls rejected by the filters never modify the client."""
+        duplo = Mock()
+        duplo.wait = False
+
+        ctx = self._make_ctx(duplo, resource_list=["tenant"])
+        execute(ctx, resource="service", command="list", wait=True)
+
+        assert duplo.wait is False
+        duplo.assert_not_called()
+
     def test_execute_name_and_args_combined(self):
         """Execute with both name and args dict merges all into kwargs."""
-        duplo = MagicMock()
-        duplo.__call__ = MagicMock(return_value="ok")
+        duplo = _recording_duplo("ok")
 
         ctx = self._make_ctx(duplo)
         execute(ctx, resource="service", command="update_image",
                 name="my-svc", args={"image": "nginx:latest"})
 
-        duplo.assert_called_with("service", "update_image", query=None,
-                                 image="nginx:latest", name="my-svc")
+        assert duplo.calls[-1] == (("service", "update_image"),
+                                   {"query": None, "image": "nginx:latest", "name": "my-svc"})
 
     def test_execute_returns_error_on_exception(self):
         """Execute catches exceptions and returns an error string."""
-        duplo = MagicMock()
+        duplo = Mock()
         duplo.side_effect = Exception("boom")
 
         ctx = self._make_ctx(duplo)
@@ -348,11 +385,10 @@ class TestCompactExplainResource:
 
     def test_explain_resource_lists_all_commands(self):
         """explain_resource returns all commands with summaries."""
-        duplo = MagicMock()
+        duplo = Mock()
 
-        resource_obj = MagicMock()
-        resource_obj.create = MagicMock(__doc__="Create a new tenant")
-        resource_obj.list = MagicMock(__doc__="List all tenants")
+        resource_obj = SimpleNamespace(create=_documented("Create a new tenant"),
+                                       list=_documented("List all tenants"))
         duplo.load.return_value = resource_obj
 
         ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
@@ -366,26 +402,55 @@ class TestCompactExplainResource:
         assert "list" in result["commands"]
         assert result["commands"]["list"]["summary"] == "List all tenants"
 
+    def test_explain_resource_summary_is_first_line(self):
+        """Summaries skip leading blank lines and stop at the first newline."""
+        duplo = Mock()
+
+        resource_obj = SimpleNamespace(find=_documented("\n    Find a tenant.  \n\n    Longer text.\n"))
+        duplo.load.return_value = resource_obj
+
+        ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
+        with patch("duplocloud.mcp.compact_tools.commands_for", return_value={"find": TENANT_COMMANDS["find"]}):
+            first = explain_resource(ctx, resource="tenant")
+            second = explain_resource(ctx, resource="tenant")
+
+        assert first["commands"]["find"]["summary"] == "Find a tenant."
+        assert second == first
+        duplo.load.assert_called_once_with("tenant")
+
     def test_explain_resource_rejects_unknown(self):
         """explain_resource returns error for resource not in ctx."""
-        duplo = MagicMock()
+        duplo = _stub_duplo()
 
         ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
         result = explain_resource(ctx, resource="nonexistent")
 
         assert "error" in result
 
+    def test_failed_load_not_cached(self):
+        """A transient load failure is reported once, then retried."""
+        duplo = Mock()
+        duplo.load.side_effect = [Exception("timeout"), SimpleNamespace(find=_documented("Find"))]
+
+        ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
+        with patch("duplocloud.mcp.compact_tools.commands_for",
+                   return_value={"find": TENANT_COMMANDS["find"]}):
+            failed = explain_resource(ctx, resource="tenant")
+            retried = explain_resource(ctx, resource="tenant")
+
+        assert "timeout" in failed["error"]
+        assert retried["commands"]["find"]["summary"] == "Find"
+
 
 class TestCompactExplainCommand:
     """Tests for the compact mode explain_command tool."""
 
     def test_explain_command_with_model(self, tenant_args):
         """explain_command returns detailed args and model fields."""
-        duplo = MagicMock()
+        duplo = Mock()
         duplo.load_model.return_value = FakeModel
 
-        resource_obj = MagicMock()
-        resource_obj.create = MagicMock(__doc__="Create a tenant")
+        resource_obj = SimpleNamespace(create=_documented("Create a tenant"))
         duplo.load.return_value = resource_obj
 
         ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
@@ -398,9 +463,66 @@ class TestCompactExplainCommand:
         assert result["model"] == "AddTenantRequest"
         assert "body_schema" in result
 
+    def test_explain_command_memoized(self, tenant_args):
+        """Repeated explain_command calls reuse the first payload."""
+        duplo = Mock()
+        duplo.load_model.return_value = FakeModel
+
+        resource_obj = SimpleNamespace(create=_documented("Create a tenant"))
+        duplo.load.return_value = resource_obj
+
+        ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
+        with patch("duplocloud.mcp.compact_tools.commands_for", return_value=TENANT_COMMANDS), \
+             patch("duplocloud.mcp.compact_tools.extract_args", return_value=tenant_args["create"]):
+            first = explain_command(ctx, resource="tenant", command="create")
+            first["args_schema"]["properties"]["injected"] = {}
+            second = explain_command(ctx, resource="tenant", command="create")
+
+        # Callers get copies, so editing one never reaches the cache
+        assert "injected" not in second["args_schema"]["properties"]
+        duplo.load.assert_called_once_with("tenant")
+
+    def test_body_schema_shared_across_commands(self, tenant_args):
+        """Commands sharing a body model reuse one generated schema."""
+        duplo = Mock()
+        duplo.load_model.return_value = FakeModel
+
+        resource_obj = SimpleNamespace(create=_documented("Create a tenant"),
+                                       update=_documented("Update a tenant"))
+        duplo.load.return_value = resource_obj
+
+        commands = {
+            "create": TENANT_COMMANDS["create"],
+            "update": {**TENANT_COMMANDS["create"], "method": "update"},
+        }
+        ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
+        with patch("duplocloud.mcp.compact_tools.commands_for", return_value=commands), \
+             patch("duplocloud.mcp.compact_tools.extract_args", return_value=tenant_args["create"]):
+            create = explain_command(ctx, resource="tenant", command="create")
+            update = explain_command(ctx, resource="tenant", command="update")
+
+        assert create["body_schema"] == update["body_schema"]
+        assert _body_schema(FakeModel) is _body_schema(FakeModel)
+
+    def test_explain_tools_share_loaded_resource(self, tenant_args):
+        """explain_resource and explain_command load a resource once."""
+        duplo = Mock()
+        duplo.load_model.return_value = None
+
+        resource_obj = SimpleNamespace(find=_documented("Find a tenant"))
+        duplo.load.return_value = resource_obj
+
+        ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
+        with patch("duplocloud.mcp.compact_tools.commands_for", return_value=TENANT_COMMANDS), \
+             patch("duplocloud.mcp.compact_tools.extract_args", return_value=tenant_args["find"]):
+            explain_resource(ctx, resource="tenant")
+            explain_command(ctx, resource="tenant", command="find")
+
+        duplo.load.assert_called_once_with("tenant")
+
     def test_explain_command_unknown(self):
         """explain_command returns error with available commands for unknown command."""
-        duplo = MagicMock()
+        duplo = Mock()
 
         ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
         with patch("duplocloud.mcp.compact_tools.commands_for", return_value=TENANT_COMMANDS):
@@ -411,7 +533,7 @@ class TestCompactExplainCommand:
 
     def test_explain_command_rejects_unknown_resource(self):
         """explain_command returns error for resource not in ctx."""
-        duplo = MagicMock()
+        duplo = _stub_duplo()
 
         ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["tenant"])
         result = explain_command(ctx, resource="nonexistent", command="list")
@@ -424,7 +546,7 @@ class TestCompactResources:
 
     def test_resources_returns_all(self):
         """Resources tool returns the pre-filtered list from ctx."""
-        duplo = MagicMock()
+        duplo = _stub_duplo()
 
         ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["lambda", "service", "tenant"])
         result = resources(ctx)
@@ -433,7 +555,7 @@ class TestCompactResources:
 
     def test_resources_respects_filter(self):
         """Resources in ctx only contain what passed the filter at registration."""
-        duplo = MagicMock()
+        duplo = _stub_duplo()
 
         ctx = Ctx(duplo=duplo, config={}, tools=[], resources=["service", "tenant"])
         result = resources(ctx)
@@ -442,6 +564,20 @@ class TestCompactResources:
         assert "tenant" in result
         assert "service" in result
 
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_output_schema_is_string_array(self, mcp_instance):
+        """The declared output schema matches the sorted tuple ctx holds."""
+        ctx = Ctx(duplo=_stub_duplo(), config={}, tools=[], resources=("service", "tenant"))
+        mcp_instance.tool(name="resources")(DuploCloudMCP._inject_ctx(resources, ctx))
+
+        tool = await mcp_instance.get_tool("resources")
+        assert tool.output_schema["properties"]["result"] == {
+            "type": "array",
+            "items": {"type": "string"},
+        }
+        result = await tool.run({})
+        assert result.structured_content == {"result": ["service", "tenant"]}
+
 
 # ---------------------------------------------------------------------------
 # Self-exclusion – MCP must never be operable as a tool
@@ -469,7 +605,7 @@ class TestMcpSelfExclusion:
 
     def test_execute_rejects_mcp(self):
         """execute('mcp', 'start') is blocked because 'mcp' is not in resources."""
-        duplo = MagicMock()
+        duplo = Mock()
 
         ctx = self._ctx_without_mcp(duplo)
         result = execute(ctx, resource="mcp", command="start")
@@ -480,7 +616,7 @@ class TestMcpSelfExclusion:
 
     def test_explain_resource_rejects_mcp(self):
         """explain_resource('mcp') is blocked because 'mcp' is not in resources."""
-        duplo = MagicMock()
+        duplo = Mock()
 
         ctx = self._ctx_without_mcp(duplo)
         result = explain_resource(ctx, resource="mcp")
@@ -491,7 +627,7 @@ class TestMcpSelfExclusion:
 
     def test_explain_command_rejects_mcp(self):
         """explain_command('mcp', 'start') is blocked because 'mcp' is not in resources."""
-        duplo = MagicMock()
+        duplo = Mock()
 
         ctx = self._ctx_without_mcp(duplo)
         result = explain_command(ctx, resource="mcp", command="start")
@@ -502,7 +638,7 @@ class TestMcpSelfExclusion:
 
     def test_resources_never_lists_mcp(self):
         """The resources tool never includes 'mcp' in its output."""
-        duplo = MagicMock()
+        duplo = _stub_duplo()
 
         ctx = self._ctx_without_mcp(duplo)
         result = resources(ctx)
@@ -1,21 +1,37 @@
 """Tests for DuploCloudMCP server coordinator."""
 
 import re
-from unittest.mock import MagicMock, patch
+from operator import attrgetter
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 from fastmcp import FastMCP
 
-from duplocloud.mcp.server import DuploCloudMCP, _EXCLUDED_RESOURCES
+from duplocloud.mcp.server import (
+    COMMAND_FILTER,
+    PORT,
+    RESOURCE_FILTER,
+    TOOL_MODE,
+    TRANSPORT,
+    DuploCloudMCP,
+    _EXCLUDED_RESOURCES,
+)
 
 
-@pytest.fixture
-def mock_duplo():
-    duplo = MagicMock()
+@pytest.fixture(scope="session")
+def _shared_duplo():
+    duplo = Mock()
     duplo.config = {"Host": "https://test.duplocloud.net", "Tenant": "default"}
     return duplo
 
 
+@pytest.fixture
+def mock_duplo(_shared_duplo):
+    """The session's mock client, with its call history cleared after use."""
+    yield _shared_duplo
+    _shared_duplo.reset_mock()
+
+
 @pytest.fixture
 def mcp_server(mcp_instance, mock_duplo):
     """A DuploCloudMCP with an injected test FastMCP instance and default filters."""
@@ -24,42 +40,67 @@ def mcp_server(mcp_instance, mock_duplo):
     return server
 
 
+@pytest.fixture(scope="module")
+def default_server(_shared_duplo):
+    """One freshly constructed server, shared by read-only checks."""
+    return DuploCloudMCP(_shared_duplo)
+
+
 class TestInit:
     """Tests for DuploCloudMCP.__init__."""
 
-    def test_duplo_injected(self, mock_duplo):
-        server = DuploCloudMCP(mock_duplo)
-        assert server.duplo is mock_duplo
+    def test_duplo_injected(self, default_server, _shared_duplo):
+        assert default_server.duplo is _shared_duplo
 
-    def test_default_filters(self, mock_duplo):
-        server = DuploCloudMCP(mock_duplo)
-        assert server.resource_filter.pattern == ".*"
-        assert server.command_filter.pattern == ".*"
+    @pytest.mark.parametrize("attr,expected", [
+        ("resource_filter.pattern", ".*"),
+        ("command_filter.pattern", ".*"),
+        ("transport", "stdio"),
+        ("port", 8000),
+        ("tool_mode", "compact"),
+    ])
+    def test_defaults(self, default_server, attr, expected):
+        assert attrgetter(attr)(default_server) == expected
 
-    def test_default_transport(self, mock_duplo):
-        server = DuploCloudMCP(mock_duplo)
-        assert server.transport == "stdio"
-        assert server.port == 8000
-        assert server.tool_mode == "compact"
+    def test_mcp_defaults_to_global_instance(self, default_server):
+        from duplocloud.mcp import app
 
-    def test_mcp_initialized_to_app(self, mock_duplo):
-        server = DuploCloudMCP(mock_duplo)
-        assert server.mcp is not None
+        assert default_server.mcp is app.mcp
+        assert app.mcp is app.get_mcp()
+        assert app.mcp.version == app.__version__
+
+
+class TestArgs:
+    """Tests for the MCP-specific Arg types."""
+
+    @pytest.mark.parametrize("arg", [TRANSPORT, PORT, RESOURCE_FILTER, COMMAND_FILTER, TOOL_MODE])
+    def test_help_names_env_var(self, arg):
+        assert arg.attributes["help"].endswith(f"[env: {arg.env}]")
+
+    def test_env_overrides_default(self, monkeypatch):
+        monkeypatch.setenv("DUPLO_MCP_TOOL_MODE", "expanded")
+        assert TOOL_MODE.default == "expanded"
 
 
 class TestRegisterTools:
     """Tests for resource filter application in register_tools."""
 
-    def test_resource_filter_applied(self, mcp_instance, mock_duplo):
+    @pytest.fixture
+    def mock_tool_registrar(self, monkeypatch):
+        """Replace ToolRegistrar in the server module with a MagicMock class."""
+        mock = MagicMock()
+        monkeypatch.setattr("duplocloud.mcp.server.ToolRegistrar", mock)
+        return mock
+
+    def test_resource_filter_applied(self, mcp_instance, mock_duplo, mock_tool_registrar):
         """Only matching resources are passed to the registrar."""
         server = DuploCloudMCP(mock_duplo)
         server.mcp = mcp_instance
         server.tool_mode = "expanded"
         server.resource_filter = re.compile("tenant|service")
 
-        with patch("duplocloud.mcp.server.ToolRegistrar") as MockRegistrar:
-            mock_registrar = MockRegistrar.return_value
-            server.register_tools(["tenant", "service", "lambda", "hosts"])
+        server.register_tools(["tenant", "service", "lambda", "hosts"])
+        mock_registrar = mock_tool_registrar.return_value
 
         # Registrar should only get the filtered names
         mock_registrar.register.assert_called_once()
@@ -69,40 +110,47 @@ class TestRegisterTools:
         assert "lambda" not in registered
         assert "hosts" not in registered
 
-    def test_default_filter_passes_all(self, mcp_server):
+    def test_skipped_resources_logged_once(self, mcp_server, caplog):
+        """Filtered-out resources are reported in a single debug record."""
+        mcp_server.resource_filter = re.compile("tenant")
+
+        with caplog.at_level("DEBUG", logger="fastmcp.duplocloud.mcp.server"):
+            mcp_server.register_tools(["tenant", "service", "hosts"])
+
+        skipped = [r for r in caplog.records if r.getMessage().startswith("Skipping")]
+        assert [r.getMessage() for r in skipped] == [
+            "Skipping resources (resource filter): hosts, service"
+        ]
+
+    def test_default_filter_passes_all(self, mcp_server, mock_tool_registrar):
         """Default .* filter passes all resources."""
         mcp_server.tool_mode = "expanded"
-        with patch("duplocloud.mcp.server.ToolRegistrar") as MockRegistrar:
-            mock_registrar = MockRegistrar.return_value
-            mcp_server.register_tools(["tenant", "service", "lambda"])
+        mcp_server.register_tools(["tenant", "service", "lambda"])
 
-        registered = mock_registrar.register.call_args[0][0]
+        registered = mock_tool_registrar.return_value.register.call_args[0][0]
         assert sorted(registered) == ["lambda", "service", "tenant"]
 
-    def test_discovers_all_resources_when_none(self, mcp_server):
+    def test_discovers_all_resources_when_none(self, mcp_server, mock_tool_registrar):
         """When resource_names is None, discovers from available_resources."""
         mcp_server.tool_mode = "expanded"
-        with patch("duplocloud.mcp.server.available_resources", return_value=["tenant", "service"]), \
-             patch("duplocloud.mcp.server.ToolRegistrar") as MockRegistrar:
-            mock_registrar = MockRegistrar.return_value
+        with patch("duplocloud.mcp.server.available_resources", return_value=["tenant", "service"]):
             mcp_server.register_tools()
 
-        registered = mock_registrar.register.call_args[0][0]
+        registered = mock_tool_registrar.return_value.register.call_args[0][0]
         assert "tenant" in registered
         assert "service" in registered
 
-    def test_command_filter_passed_to_registrar(self, mcp_instance, mock_duplo):
+    def test_command_filter_passed_to_registrar(self, mcp_instance, mock_duplo, mock_tool_registrar):
         """The command filter regex is passed to ToolRegistrar."""
         server = DuploCloudMCP(mock_duplo)
         server.mcp = mcp_instance
         server.tool_mode = "expanded"
         server.command_filter = re.compile("create|find")
 
-        with patch("duplocloud.mcp.server.ToolRegistrar") as MockRegistrar:
-            server.register_tools(["tenant"])
+        server.register_tools(["tenant"])
 
         # Check that ToolRegistrar was constructed with the right command filter
-        init_args = MockRegistrar.call_args
+        init_args = mock_tool_registrar.call_args
         command_filter = init_args[0][2]  # 3rd positional arg
         assert command_filter.pattern == "create|find"
 
@@ -136,6 +184,13 @@ class TestSelfExclusion:
         assert "mcp" not in server._filtered_resources
         assert "tenant" in server._filtered_resources
 
+    def test_ctx_shares_sorted_resource_tuple(self, mcp_server):
+        """The Ctx gets the server's sorted tuple itself, not a copy."""
+        mcp_server.register_tools(["tenant", "service"])
+
+        assert mcp_server._filtered_resources == ("service", "tenant")
+        assert mcp_server._build_ctx().resources is mcp_server._filtered_resources
+
     def test_excluded_resources_constant(self):
         """The exclusion set contains 'mcp'."""
         assert "mcp" in _EXCLUDED_RESOURCES
@@ -149,3 +204,19 @@ class TestSelfExclusion:
         server.register_tools(["tenant", "mcp"])
 
         assert "mcp" not in server._filtered_resources
+
+
+class TestStartTransport:
+    """Tests for DuploCloudMCP._start_transport."""
+
+    def test_env_info_skipped_above_info(self, mock_duplo):
+        """The YAML environment dump is only built when INFO is logged."""
+        server = DuploCloudMCP(mock_duplo)
+        server.mcp = Mock()
+
+        with patch("duplocloud.mcp.server.load_format") as mock_load_format, \
+             patch("duplocloud.mcp.server.logger.isEnabledFor", return_value=False):
+            server._start_transport()
+
+        mock_load_format.assert_not_called()
+        server.mcp.run.assert_called_once_with(transport="stdio")
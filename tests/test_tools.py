@@ -6,12 +6,21 @@ mechanics in isolation.
 
 import inspect
 import re
-from unittest.mock import MagicMock, patch
+from unittest.mock import Mock, patch
 
 import pytest
+from duplocloud.errors import DuploError
 from fastmcp import FastMCP
+from jinja2 import Template
 
+from duplocloud import commander
 from duplocloud.mcp.tools import ToolRegistrar
+from duplocloud.mcp.utils import (
+    commands_for,
+    extract_args,
+    get_docstring_summary,
+    resolve_docstring_template,
+)
 
 
 # Minimal mock Arg that mimics duploctl's Arg type
@@ -29,7 +38,7 @@ class MockModel:
 
 @pytest.fixture
 def mock_duplo():
-    duplo = MagicMock()
+    duplo = Mock()
     duplo.load_model.return_value = None
     return duplo
 
@@ -97,6 +106,14 @@ class TestBuildParams:
         assert len(params) == 1
         assert params[0].annotation is dict
 
+    def test_model_loaded_once_per_name(self, registrar):
+        """Commands sharing a model resolve it through the duplo client once."""
+        registrar.duplo.load_model.return_value = MockModel
+
+        assert registrar.load_model("SomeModel") is MockModel
+        assert registrar.load_model("SomeModel") is MockModel
+        registrar.duplo.load_model.assert_called_once_with("SomeModel")
+
     def test_model_only_applies_to_body_param(self, registrar):
         """Non-body params keep their original type even when model exists."""
         registrar.duplo.load_model.return_value = MockModel
@@ -114,38 +131,54 @@ class TestBuildParams:
         assert params[1].name == "body"
         assert params[1].annotation is MockModel
 
+    def test_params_built_once_per_function(self, registrar):
+        """Bound methods of the same function share the built params."""
+        class Resource:
+            def find(self, name="default"):
+                pass
+
+        mock_args = [MockArg("name", str)]
+
+        with patch("duplocloud.mcp.tools.extract_args", return_value=mock_args) as mock_extract:
+            first = registrar.build_params(Resource().find, {})
+            second = registrar.build_params(Resource().find, {})
+
+        assert first == second
+        mock_extract.assert_called_once()
+
 
 class TestBuildWrapper:
     """Tests for ToolRegistrar.build_wrapper."""
 
+    NAME_PARAM = (
+        inspect.Parameter(
+            "name",
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            default="test",
+            annotation=str,
+        ),
+    )
+
     def test_wrapper_preserves_name(self, registrar):
-        def method():
+        def method(name="test"):
             return "result"
 
-        wrapper = registrar.build_wrapper(method, "tenant_create", "Create a tenant", [])
+        wrapper = registrar.build_wrapper(method, "tenant_create", "Create a tenant", self.NAME_PARAM)
         assert wrapper.__name__ == "tenant_create"
 
     def test_wrapper_preserves_docstring(self, registrar):
-        def method():
+        def method(name="test"):
             return "result"
 
         doc = "Create a new tenant."
-        wrapper = registrar.build_wrapper(method, "tenant_create", doc, [])
+        wrapper = registrar.build_wrapper(method, "tenant_create", doc, self.NAME_PARAM)
         assert wrapper.__doc__ == doc
 
     def test_wrapper_signature_matches_params(self, registrar):
         def method(name="test"):
             return name
 
-        params = [
-            inspect.Parameter(
-                "name",
-                inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                default="test",
-                annotation=str,
-            )
-        ]
-        wrapper = registrar.build_wrapper(method, "tenant_find", "Find", params)
+        wrapper = registrar.build_wrapper(method, "tenant_find", "Find", self.NAME_PARAM)
 
         sig = inspect.signature(wrapper)
         assert "name" in sig.parameters
@@ -158,11 +191,20 @@ class TestBuildWrapper:
             called["name"] = name
             return f"hello {name}"
 
-        wrapper = registrar.build_wrapper(method, "test_tool", "Test", [])
+        wrapper = registrar.build_wrapper(method, "test_tool", "Test", self.NAME_PARAM)
         result = wrapper(name="duplo")
         assert result == "hello duplo"
         assert called["name"] == "duplo"
 
+    def test_no_params_returns_method(self, registrar):
+        """Without params the method is registered as is, with no wrapper."""
+        class Resource:
+            def list(self, limit: int = 10):
+                return limit
+
+        method = Resource().list
+        assert registrar.build_wrapper(method, "thing_list", "List", []) is method
+
 
 class TestRegisterResource:
     """Tests for ToolRegistrar.register_resource."""
@@ -172,10 +214,10 @@ class TestRegisterResource:
         command_filter = re.compile("create|update")
         registrar = ToolRegistrar(mcp_instance, mock_duplo, command_filter)
 
-        mock_resource = MagicMock()
-        mock_resource.create = MagicMock(__doc__="Create")
-        mock_resource.list = MagicMock(__doc__="List")
-        mock_resource.delete = MagicMock(__doc__="Delete")
+        mock_resource = Mock()
+        mock_resource.create = Mock(__doc__="Create")
+        mock_resource.list = Mock(__doc__="List")
+        mock_resource.delete = Mock(__doc__="Delete")
         mock_duplo.load.return_value = mock_resource
 
         commands = {
@@ -194,6 +236,22 @@ class TestRegisterResource:
         assert "list" not in registered_methods
         assert "delete" not in registered_methods
 
+    def test_match_all_filter_not_called(self, mcp_instance, mock_duplo):
+        """The default .* filter registers every command without matching."""
+        command_filter = Mock(pattern=".*")
+        registrar = ToolRegistrar(mcp_instance, mock_duplo, command_filter)
+        commands = {
+            "create": {"method": "create", "aliases": [], "model": None},
+            "list": {"method": "list", "aliases": [], "model": None},
+        }
+
+        with patch("duplocloud.mcp.tools.commands_for", return_value=commands), \
+             patch.object(registrar, "register_tool") as mock_register:
+            registrar.register_resource("test_resource")
+
+        command_filter.fullmatch.assert_not_called()
+        assert [call.args[1] for call in mock_register.call_args_list] == ["create", "list"]
+
 
 class TestRegister:
     """Tests for ToolRegistrar.register (top-level)."""
@@ -213,3 +271,78 @@ class TestRegister:
             registrar.register(["good_resource", "bad_resource", "another_good"])
 
         assert call_log == ["good_resource", "bad_resource", "another_good"]
+
+
+class TestResolveDocstringTemplate:
+    """Tests for the docstring templating ToolRegistrar applies."""
+
+    def test_renders_kind(self):
+        assert resolve_docstring_template("List {{kind}} items.", "service") == "List service items."
+
+    @pytest.mark.parametrize("doc", [
+        "List {{kind}} items.\n",
+        "Find a {{ kind | lower }} by name.",
+        "Find a {{kind|lower}} with {{command}}.",
+        "List items.\n",
+    ])
+    def test_matches_jinja(self, doc):
+        expected = Template(doc).render(kind="Service")
+        assert resolve_docstring_template(doc, "Service") == expected
+
+    def test_kind_only_skips_jinja(self):
+        with patch("duplocloud.mcp.utils.Template") as MockTemplate:
+            assert resolve_docstring_template("Kind {{kind|lower}}.", "Pod") == "Kind pod."
+        MockTemplate.assert_not_called()
+
+    def test_plain_docstring_skips_jinja(self):
+        doc = "List items.\n"
+        with patch("duplocloud.mcp.utils.Template") as MockTemplate:
+            assert resolve_docstring_template(doc, "service") == "List items."
+        MockTemplate.assert_not_called()
+
+
+class TestCommandsFor:
+    """The cached commands_for agrees with duploctl's schema scan."""
+
+    @pytest.mark.parametrize("name", ["tenant", "service", "hosts"])
+    def test_matches_commander(self, name):
+        commander.load_resource(name)
+        expected = commander.commands_for(name)
+        result = commands_for(name)
+        assert result == expected
+        assert list(result) == list(expected)
+
+    def test_cached_per_name(self):
+        commander.load_resource("tenant")
+        assert commands_for("tenant") is commands_for("tenant")
+
+    def test_unknown_resource_raises(self):
+        with pytest.raises(DuploError):
+            commands_for("no_such_resource")
+
+
+class TestExtractArgs:
+    """The cached extract_args agrees with duploctl's and is shared per function."""
+
+    def test_matches_commander(self):
+        tenant = commander.load_resource("tenant")
+        expected = commander.extract_args(tenant.find)
+        result = extract_args(tenant.find)
+        assert [a.__name__ for a in result] == [a.__name__ for a in expected]
+
+    def test_bound_methods_share_entry(self):
+        tenant = commander.load_resource("tenant")
+        assert extract_args(tenant(Mock()).find) is extract_args(tenant.find)
+
+
+class TestGetDocstringSummary:
+    """Tests for the log summary of a tool docstring."""
+
+    @pytest.mark.parametrize("doc, expected", [
+        ("", ""),
+        ("   \n  ", ""),
+        ("Find a tenant.", " - Find a tenant."),
+        ("\n  Find a\n  tenant.\n\n  Args:\n    name: x\n", " - Find a   tenant."),
+    ])
+    def test_first_paragraph(self, doc, expected):
+        assert get_docstring_summary(doc) == expected